@@ -9,8 +9,19 @@ version: 0.1.0
 license: MIT
 """
 
-from typing import Any, Callable
+import asyncio
+import gzip
+import json
+import re
+import sqlite3
+import time
+from collections import OrderedDict
+from contextlib import closing
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 from langchain_community.document_loaders import YoutubeLoader
+from langchain_community.document_loaders.youtube import TranscriptFormat
 from langchain_yt_dlp.youtube_loader import YoutubeLoaderDL
 from pydantic import BaseModel, Field
 
@@ -42,11 +53,157 @@ class EventEmitter:
             )
 
 
+async def _gather_or_cancel(*aws: Awaitable) -> List[Any]:
+    """Run awaitables concurrently; if one fails, cancel the rest and re-raise."""
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        return await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+def _extract_video_id(url: str) -> Optional[str]:
+    """Return the 11 character video ID of a YouTube video URL, if any."""
+    match = re.search(
+        r"(?:youtube\.com/(?:watch\?(?:.*&)?v=|embed/|v/|shorts/)|youtu\.be/)([a-zA-Z0-9_-]{11})",
+        url,
+    )
+    return match.group(1) if match else None
+
+
+# A channel's home page: flat extraction lists its tabs, not its videos
+_CHANNEL_ROOT = re.compile(
+    r"^(https?://(?:www\.|m\.)?youtube\.com/(?:@[^/?#]+|channel/[^/?#]+|c/[^/?#]+|user/[^/?#]+))/?$"
+)
+
+
+class TranscriptIndex:
+    """
+    SQLite FTS5 index over every transcript fetched, with segment start times.
+    The schema is shared with the transcript filter in functions/youtube_transcript.py.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS videos (
+            video_id TEXT PRIMARY KEY,
+            url TEXT,
+            title TEXT,
+            author TEXT,
+            indexed_at REAL
+        );
+        CREATE VIRTUAL TABLE IF NOT EXISTS segments USING fts5(
+            text, video_id UNINDEXED, start_seconds UNINDEXED
+        );
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._ready:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self.SCHEMA)
+            self._ready = True
+        return conn
+
+    def add(
+        self,
+        video_id: str,
+        url: str,
+        title: str,
+        author: str,
+        segments: List[Tuple[float, str]],
+    ):
+        """Replace the indexed segments of one video."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM segments WHERE video_id = ?", (video_id,))
+            conn.executemany(
+                "INSERT INTO segments (text, video_id, start_seconds) VALUES (?, ?, ?)",
+                [(text, video_id, int(start)) for start, text in segments if text],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO videos VALUES (?, ?, ?, ?, ?)",
+                (video_id, url, title, author, time.time()),
+            )
+
+    def search(self, query: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Return matching segments, best matches first."""
+        # Quote every term so user input can never be parsed as FTS5 syntax
+        match = " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+        if not match:
+            return []
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                """
+                SELECT s.video_id, v.url, v.title, v.author, s.start_seconds,
+                       snippet(segments, 0, '**', '**', '…', 12)
+                FROM segments s LEFT JOIN videos v ON v.video_id = s.video_id
+                WHERE segments MATCH ?
+                ORDER BY bm25(segments)
+                LIMIT ?
+                """,
+                (match, limit),
+            ).fetchall()
+
+        return [
+            {
+                "video_id": video_id,
+                "url": url,
+                "title": title,
+                "author": author,
+                "start_seconds": start,
+                "snippet": snippet,
+            }
+            for video_id, url, title, author, start, snippet in rows
+        ]
+
+
+def _format_timestamp(seconds: int) -> str:
+    m, s = divmod(int(seconds), 60)
+    h, m = divmod(m, 60)
+    return f"{h:d}:{m:02d}:{s:02d}" if h else f"{m:d}:{s:02d}"
+
+
 class Tools:
     class Valves(BaseModel):
         CITATION: bool = Field(
             default=True, description="True or false for citation"
         )
+        BATCH_CONCURRENCY: int = Field(
+            default=4, description="Videos fetched at the same time by the batch tool"
+        )
+        BATCH_MAX_VIDEOS: int = Field(
+            default=50, description="Maximum videos taken from one playlist or channel"
+        )
+        BATCH_OUTPUT_DIR: str = Field(
+            default="data/transcripts",
+            description="Directory where batch transcripts are written as JSONL",
+        )
+        CACHE_SIZE: int = Field(
+            default=128, description="Transcripts kept in memory for repeat requests"
+        )
+        INDEX_TRANSCRIPTS: bool = Field(
+            default=True,
+            description="Add fetched transcripts to the local search index",
+        )
+        INDEX_PATH: str = Field(
+            default="data/transcripts/index.db",
+            description="SQLite file holding the transcript search index",
+        )
+        INDEX_CHUNK_SECONDS: int = Field(
+            default=30, description="Length of each timestamped transcript segment"
+        )
+        BLOB_DIR: str = Field(
+            default="data/transcripts/blobs",
+            description="Transcript store written by the YouTube Transcript Extractor filter in 'handle' mode",
+        )
 
     class UserValves(BaseModel):
         TRANSCRIPT_LANGUAGE: str = Field(
@@ -64,6 +221,115 @@ class Tools:
     def __init__(self):
         self.valves = self.Valves()
         self.citation = self.valves.CITATION
+        # Shared across single and batch calls: finished results (LRU) and
+        # in-flight fetches, so the same video is only downloaded once.
+        self._cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+        self._index: Optional[TranscriptIndex] = None
+
+    def _get_index(self) -> TranscriptIndex:
+        if self._index is None or self._index.path != self.valves.INDEX_PATH:
+            self._index = TranscriptIndex(self.valves.INDEX_PATH)
+        return self._index
+
+    async def _fetch_video(
+        self, url: str, user_valves, emitter: EventEmitter
+    ) -> Dict[str, Any]:
+        """Fetch details and transcript for one video, raising on failure."""
+        languages = [
+            item.strip() for item in user_valves.TRANSCRIPT_LANGUAGE.split(",")
+        ]
+
+        async def fetch_details():
+            details = await YoutubeLoaderDL.from_youtube_url(
+                url, add_video_info=True
+            ).aload()
+
+            if len(details) == 0:
+                raise Exception("Failed to get video details")
+
+            title = details[0].metadata["title"]
+            author = details[0].metadata["author"]
+            await emitter.progress_update(f"Grabbed details for {title} by {author}")
+            return title, author
+
+        async def fetch_transcript():
+            documents = await YoutubeLoader.from_youtube_url(
+                url,
+                add_video_info=False,
+                language=languages,
+                translation=user_valves.TRANSCRIPT_TRANSLATE,
+                transcript_format=TranscriptFormat.CHUNKS,
+                chunk_size_seconds=self.valves.INDEX_CHUNK_SECONDS,
+            ).aload()
+            await emitter.progress_update(
+                f"Downloaded transcript ({len(documents)} parts)"
+            )
+            return documents
+
+        # Details and transcript are independent, so fetch them together
+        title = ""
+        author = ""
+        if user_valves.GET_VIDEO_DETAILS:
+            await emitter.progress_update("Getting video details and transcript")
+            (title, author), transcript = await _gather_or_cancel(
+                fetch_details(), fetch_transcript()
+            )
+        else:
+            await emitter.progress_update("Getting transcript")
+            transcript = await fetch_transcript()
+
+        if len(transcript) == 0:
+            raise Exception(f"Failed to find transcript for {title if title else url}")
+
+        segments = [
+            (document.metadata.get("start_seconds", 0), document.page_content)
+            for document in transcript
+        ]
+        video_id = _extract_video_id(url)
+        if self.valves.INDEX_TRANSCRIPTS and video_id:
+            try:
+                await asyncio.to_thread(
+                    self._get_index().add, video_id, url, title, author, segments
+                )
+            except Exception as e:
+                print(f"Transcript indexing failed: {e}")
+
+        # Chunks are only for the index; the text is what TranscriptFormat.TEXT gives
+        return {
+            "title": title,
+            "author": author,
+            "transcript": " ".join([text for _, text in segments]),
+        }
+
+    async def _fetch_video_cached(
+        self, url: str, user_valves, emitter: EventEmitter
+    ) -> Dict[str, Any]:
+        """_fetch_video with result caching and in-flight request sharing."""
+        key = (
+            _extract_video_id(url) or url,
+            user_valves.TRANSCRIPT_LANGUAGE,
+            user_valves.TRANSCRIPT_TRANSLATE,
+            user_valves.GET_VIDEO_DETAILS,
+        )
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_video(url, user_valves, emitter))
+            self._inflight[key] = task
+            try:
+                result = await asyncio.shield(task)
+            finally:
+                self._inflight.pop(key, None)
+            self._cache[key] = result
+            while len(self._cache) > self.valves.CACHE_SIZE:
+                self._cache.popitem(last=False)
+            return result
+
+        return await asyncio.shield(task)
 
     async def get_youtube_transcript(
         self,
@@ -93,50 +359,284 @@ class Tools:
             elif "dQw4w9WgXcQ" in url:
                 raise Exception("Rick Roll URL provided... is that what you want?)")
 
-            # Get video details if the user wants them
-            title = ""
-            author = ""
-            if __user__["valves"].GET_VIDEO_DETAILS:
-                await emitter.progress_update("Getting video details")
-                details = await YoutubeLoaderDL.from_youtube_url(
-                    url, add_video_info=True
-                ).aload()
+            video = await self._fetch_video_cached(url, __user__["valves"], emitter)
+            title = video["title"]
+            author = video["author"]
+            transcript = video["transcript"]
+
+            if title and author:
+                transcript = f"{title}\nby {author}\n\n{transcript}"
+
+            await emitter.success_update(f"Transcript for video {title} retrieved!")
+            return transcript
+
+        except Exception as e:
+            error_message = f"Error: {str(e)}"
+            await emitter.error_update(error_message)
+            return error_message
+
+    async def get_youtube_transcripts_batch(
+        self,
+        urls: str,
+        __event_emitter__: Callable[[dict], Any] = None,
+        __user__: dict = {},
+    ) -> str:
+        """
+        Fetches transcripts for many YouTube videos at once and saves them to a JSONL file.
+        Use when the user supplies a playlist URL, a channel URL, or several video URLs.
+
+        :param urls: A playlist or channel URL, or video URLs separated by commas, spaces or newlines.
+        :return: A per-video summary and the path of the JSONL file holding the transcripts.
+        """
+        emitter = EventEmitter(__event_emitter__)
+        if "valves" not in __user__:
+            __user__["valves"] = self.UserValves()
+
+        try:
+            await emitter.progress_update("Resolving video list")
+            video_urls, failed = await self._expand_urls(urls)
+            if not video_urls and not failed:
+                raise Exception(f"No YouTube videos found in: {urls}")
 
-                if len(details) == 0:
-                    raise Exception("Failed to get video details")
+            total = len(video_urls) + len(failed)
+            done = len(failed)
+            semaphore = asyncio.Semaphore(max(1, self.valves.BATCH_CONCURRENCY))
+            quiet = EventEmitter()
 
-                title = details[0].metadata["title"]
-                author = details[0].metadata["author"]
+            async def worker(video_url: str) -> Dict[str, Any]:
+                nonlocal done
+                record = {
+                    "video_id": _extract_video_id(video_url),
+                    "url": video_url,
+                    "title": "",
+                    "author": "",
+                    "transcript": "",
+                    "error": None,
+                }
+                async with semaphore:
+                    try:
+                        record.update(
+                            await self._fetch_video_cached(
+                                video_url, __user__["valves"], quiet
+                            )
+                        )
+                    except Exception as e:
+                        record["error"] = str(e)
+
+                done += 1
+                status = "failed" if record["error"] else "retrieved"
                 await emitter.progress_update(
-                    f"Grabbed details for {title} by {author}"
+                    f"[{done}/{total}] {record['title'] or video_url} {status}"
                 )
+                return record
 
-            languages = [
-                item.strip()
-                for item in __user__["valves"].TRANSCRIPT_LANGUAGE.split(",")
+            # Inputs that could not be resolved to videos are reported like failed videos
+            records = [
+                {"video_id": None, "url": item, "title": "", "author": "",
+                 "transcript": "", "error": error}
+                for item, error in failed
             ]
+            records += await asyncio.gather(*[worker(u) for u in video_urls])
+            output_path = self._write_jsonl(records)
 
-            transcript = await YoutubeLoader.from_youtube_url(
-                url,
-                add_video_info=False,
-                language=languages,
-                translation=__user__["valves"].TRANSCRIPT_TRANSLATE,
-            ).aload()
+            ok = [r for r in records if not r["error"]]
+            lines = [
+                f"- {r['title'] or r['url']}: "
+                + (
+                    f"{len(r['transcript'])} chars"
+                    if not r["error"]
+                    else f"error: {r['error']}"
+                )
+                for r in records
+            ]
+            await emitter.success_update(f"Retrieved {len(ok)}/{total} transcripts")
+            return (
+                f"Retrieved {len(ok)} of {total} transcripts.\n"
+                f"Saved to: {output_path}\n\n" + "\n".join(lines)
+            )
 
-            if len(transcript) == 0:
-                raise Exception(
-                    f"Failed to find transcript for {title if title else url}"
+        except Exception as e:
+            error_message = f"Error: {str(e)}"
+            await emitter.error_update(error_message)
+            return error_message
+
+    async def search_transcripts(
+        self,
+        query: str,
+        __event_emitter__: Callable[[dict], Any] = None,
+        __user__: dict = {},
+    ) -> str:
+        """
+        Searches every YouTube transcript fetched so far and tells which videos mention the query and at what times.
+        Use to answer questions like "which videos talk about X" without re-downloading transcripts.
+
+        :param query: The words to search for.
+        :return: Matching videos with timestamped links and snippets, or a message if nothing matches.
+        """
+        emitter = EventEmitter(__event_emitter__)
+
+        try:
+            start = time.perf_counter()
+            hits = await asyncio.to_thread(self._get_index().search, query)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+            if not hits:
+                await emitter.success_update(
+                    f"No indexed transcripts mention '{query}'"
                 )
+                return f"No indexed transcripts mention '{query}'."
 
-            transcript = "\n".join([document.page_content for document in transcript])
+            # Group hits by video, keeping the best-ranked video first
+            videos: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+            for hit in hits:
+                videos.setdefault(hit["video_id"], []).append(hit)
 
-            if title and author:
-                transcript = f"{title}\nby {author}\n\n{transcript}"
+            lines = [f"Found '{query}' in {len(videos)} video(s):", ""]
+            for video_id, video_hits in videos.items():
+                first = video_hits[0]
+                lines.append(
+                    f"{first['title'] or video_id}"
+                    + (f" by {first['author']}" if first["author"] else "")
+                )
+                for hit in sorted(video_hits, key=lambda h: h["start_seconds"]):
+                    link = f"https://www.youtube.com/watch?v={video_id}&t={hit['start_seconds']}s"
+                    lines.append(
+                        f"  [{_format_timestamp(hit['start_seconds'])}]({link}) {hit['snippet']}"
+                    )
+                lines.append("")
 
-            await emitter.success_update(f"Transcript for video {title} retrieved!")
-            return transcript
+            await emitter.success_update(
+                f"Found {len(hits)} matches in {len(videos)} videos ({elapsed_ms:.1f} ms)"
+            )
+            return "\n".join(lines).rstrip()
 
         except Exception as e:
             error_message = f"Error: {str(e)}"
             await emitter.error_update(error_message)
             return error_message
+
+    async def resolve_transcript_handle(
+        self,
+        handle: str,
+        start_char: int = 0,
+        max_chars: int = 20000,
+        __event_emitter__: Callable[[dict], Any] = None,
+        __user__: dict = {},
+    ) -> str:
+        """
+        Returns the transcript text behind a handle such as `yt-transcript:1a2b3c...` found in a message.
+        Use when the full transcript is needed; long transcripts can be read in pages.
+
+        :param handle: The transcript handle, e.g. yt-transcript:0123456789abcdef01234567.
+        :param start_char: Character offset to start reading from, for paging through long transcripts.
+        :param max_chars: Maximum number of characters to return.
+        :return: The requested part of the transcript, or an error message.
+        """
+        emitter = EventEmitter(__event_emitter__)
+
+        try:
+            key = handle.strip().strip("`").removeprefix("yt-transcript:")
+            if not re.fullmatch(r"[0-9a-f]{24}", key):
+                raise Exception(f"Invalid transcript handle: {handle}")
+
+            path = Path(self.valves.BLOB_DIR) / key[:2] / f"{key}.txt.gz"
+            if not path.exists():
+                raise Exception(f"No stored transcript for handle: {handle}")
+
+            text = await asyncio.to_thread(
+                lambda: gzip.decompress(path.read_bytes()).decode("utf-8")
+            )
+            start_char = max(0, start_char)
+            end_char = min(len(text), start_char + max(1, max_chars))
+
+            await emitter.success_update(
+                f"Loaded transcript characters {start_char}-{end_char} of {len(text)}"
+            )
+            part = text[start_char:end_char]
+            if end_char < len(text):
+                part += (
+                    f"\n\n[Truncated: {len(text) - end_char} more characters. "
+                    f"Call again with start_char={end_char} to continue.]"
+                )
+            return part
+
+        except Exception as e:
+            error_message = f"Error: {str(e)}"
+            await emitter.error_update(error_message)
+            return error_message
+
+    async def _expand_urls(self, urls: str) -> Tuple[List[str], List[Tuple[str, str]]]:
+        """
+        Turn user input into a list of video URLs, expanding playlists and channels.
+        Also returns (input, error) for each item that could not be expanded,
+        so one bad item does not abort the batch.
+        """
+        video_urls = []
+        failed = []
+        for item in re.split(r"[\s,]+", urls.strip()):
+            if not item:
+                continue
+            if _extract_video_id(item) and "list=" not in item:
+                video_urls.append(item)
+            elif not re.match(r"https?://(?:[\w-]+\.)?(?:youtube\.com|youtu\.be)/", item):
+                failed.append((item, "not a YouTube URL"))
+            else:
+                try:
+                    video_urls.extend(await asyncio.to_thread(self._list_playlist, item))
+                except Exception as e:
+                    failed.append((item, str(e)))
+
+        # Keep order, drop duplicates
+        return list(dict.fromkeys(video_urls))[: self.valves.BATCH_MAX_VIDEOS], failed
+
+    def _list_playlist(self, url: str) -> List[str]:
+        """List the videos of a playlist or channel without resolving each one."""
+        import yt_dlp
+
+        # Point a channel at its Videos tab instead of its tab list
+        channel = _CHANNEL_ROOT.match(url)
+        if channel:
+            url = f"{channel.group(1)}/videos"
+
+        ydl_opts = {
+            "extract_flat": "in_playlist",
+            "playlistend": self.valves.BATCH_MAX_VIDEOS,
+            "quiet": True,
+            "no_warnings": True,
+        }
+        limit = self.valves.BATCH_MAX_VIDEOS
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+
+            def collect(info: Dict[str, Any], depth: int) -> List[str]:
+                video_urls = []
+                for entry in info.get("entries") or [info]:
+                    if len(video_urls) >= limit:
+                        break
+                    if not entry:
+                        continue
+                    if entry.get("id") and len(entry["id"]) == 11:
+                        video_urls.append(f"https://www.youtube.com/watch?v={entry['id']}")
+                    elif depth < 2 and entry.get("_type") in ("playlist", "url"):
+                        # A tab (Videos/Shorts/Live) or nested playlist
+                        if entry.get("entries") is None and entry.get("url"):
+                            entry = ydl.extract_info(entry["url"], download=False)
+                        video_urls.extend(collect(entry, depth + 1))
+                return video_urls
+
+            return collect(ydl.extract_info(url, download=False), 0)[:limit]
+
+    def _write_jsonl(self, records: List[Dict[str, Any]]) -> str:
+        """Write one JSON object per video and return the file path."""
+        output_dir = Path(self.valves.BATCH_OUTPUT_DIR)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        now = datetime.now(timezone.utc)
+        fetched_at = now.isoformat()
+        path = output_dir / f"transcripts-{now:%Y%m%d-%H%M%S}.jsonl"
+
+        with open(path, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(
+                    json.dumps({**record, "fetched_at": fetched_at}, ensure_ascii=False)
+                )
+                f.write("\n")
+        return str(path)
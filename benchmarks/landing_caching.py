@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark: bytes and latency per landing page visit, cold vs repeat
+
+Serves a copy of static/ (with .gz siblings, plus .br when the brotli
+package is installed) from test-landing.py and loads the landing page's
+assets three ways: a cold visit, a cold visit accepting compression, and
+a repeat visit revalidating with the ETags from the first one.
+
+Usage:
+    python benchmarks/landing_caching.py --visits 50
+"""
+
+import argparse
+import gzip
+import http.client
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from landing_concurrency import ROOT, SERVER, free_port, wait_for
+
+PAGE = ["/", "/brandfactory/brandfactory-logo.png", "/brandfactory/custom-branding.js",
+        "/brandfactory/favicon.png"]
+COMPRESSIBLE = (".js", ".css", ".html", ".svg", ".json")
+
+
+def prepare(tmp):
+    """Copy the site into `tmp` and precompress text assets"""
+    static_dir, landing_dir = tmp / "static", tmp / "landing"
+    shutil.copytree(ROOT / "static", static_dir)
+    landing_dir.mkdir()
+    index = ROOT / "landing" / "dist" / "index.html"
+    if not index.exists():
+        index = ROOT / "landing" / "react-landing" / "index.html"
+    shutil.copy(index, landing_dir / "index.html")
+
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+    for path in list(static_dir.iterdir()) + [landing_dir / "index.html"]:
+        if path.suffix in COMPRESSIBLE:
+            data = path.read_bytes()
+            path.with_name(path.name + ".gz").write_bytes(gzip.compress(data, 9))
+            if brotli:
+                path.with_name(path.name + ".br").write_bytes(brotli.compress(data))
+    return static_dir, landing_dir
+
+
+def visit(conn, headers_for):
+    """Fetch the page's assets; returns (bytes on the wire, seconds, {path: etag})"""
+    wire, etags = 0, {}
+    start = time.perf_counter()
+    for path in PAGE:
+        conn.request("GET", path, headers=headers_for(path))
+        response = conn.getresponse()
+        body = response.read()
+        wire += len(body) + len(str(response.msg)) + len(f"HTTP/1.1 {response.status} {response.reason}\r\n")
+        etags[path] = response.headers.get("ETag")
+    return wire, time.perf_counter() - start, etags
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--visits", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        static_dir, landing_dir = prepare(Path(tmp))
+        port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, str(SERVER), "--host", "127.0.0.1", "--port", str(port), "--quiet",
+             "--static-dir", str(static_dir), "--landing-dir", str(landing_dir)],
+            cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_for(port)
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+            _, _, etags = visit(conn, lambda path: {})
+
+            scenarios = {
+                "cold visit": lambda path: {},
+                "cold, gzip/br accepted": lambda path: {"Accept-Encoding": "br, gzip"},
+                "repeat (If-None-Match)": lambda path: {"If-None-Match": etags[path]},
+            }
+            results = {}
+            for name, headers_for in scenarios.items():
+                runs = [visit(conn, headers_for) for _ in range(args.visits)]
+                results[name] = (runs[0][0], statistics.median(run[1] for run in runs))
+            conn.close()
+        finally:
+            server.terminate()
+            server.wait()
+
+    cold_bytes = results["cold visit"][0]
+    print(f"Landing page visit ({len(PAGE)} requests, median of {args.visits}):\n")
+    for name, (wire, seconds) in results.items():
+        print(f"  {name:<24} {wire:>8,} bytes ({wire / cold_bytes:6.1%})  {seconds * 1000:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark: test-landing.py under concurrent clients
+
+Starts the landing server on a free port, opens a number of "slow"
+connections that send half a request and then stall, and meanwhile runs
+concurrent keep-alive clients fetching static assets. Reports throughput
+and latency percentiles; with a single-threaded server the stalled
+connections would block every other client.
+
+Usage:
+    python benchmarks/landing_concurrency.py --clients 16 --requests 200 --slow 4
+"""
+
+import argparse
+import http.client
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SERVER = ROOT / "test-landing.py"
+
+PATHS = ["/brandfactory/brandfactory-logo.png", "/brandfactory/custom-branding.js",
+         "/brandfactory/favicon.png", "/health"]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for(port, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("server did not start")
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def client(port, requests, paths):
+    """One keep-alive client; returns (latencies, bytes received, errors)"""
+    latencies, received, errors = [], 0, 0
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    for i in range(requests):
+        path = paths[i % len(paths)]
+        start = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            response = conn.getresponse()
+            body = response.read()
+            if response.status != 200 or len(body) != int(response.headers["Content-Length"]):
+                errors += 1
+            received += len(body)
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+    return latencies, received, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per client")
+    parser.add_argument("--slow", type=int, default=4, help="Stalled connections held open")
+    args = parser.parse_args()
+
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, str(SERVER), "--host", "127.0.0.1", "--port", str(port), "--quiet"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for(port)
+
+        # Slow clients: half a request line, then nothing
+        slow = []
+        for _ in range(args.slow):
+            s = socket.create_connection(("127.0.0.1", port))
+            s.sendall(b"GET /brandfactory/favicon.png HT")
+            slow.append(s)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.clients) as pool:
+            results = list(pool.map(lambda _: client(port, args.requests, PATHS), range(args.clients)))
+        elapsed = time.perf_counter() - start
+
+        for s in slow:
+            s.close()
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies = [latency for result in results for latency in result[0]]
+    received = sum(result[1] for result in results)
+    errors = sum(result[2] for result in results)
+    total = len(latencies)
+
+    print(f"{args.clients} clients x {args.requests} requests, {args.slow} stalled connections")
+    print(f"  {total / elapsed:,.0f} req/s · {received / elapsed / 1e6:.1f} MB/s · {errors} errors")
+    print(f"  latency p50 {statistics.median(latencies) * 1000:.2f} ms · "
+          f"p95 {percentile(latencies, 95) * 1000:.2f} ms · "
+          f"p99 {percentile(latencies, 99) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Benchmark: async load generator for the landing/proxy routes in nginx.conf
+
+Reads the `location` blocks of nginx.conf, finds request paths for each
+one (the landing page's own asset references, the files in static/ under
+/brandfactory/, /health, and a few Open WebUI paths for the catch-all
+proxy) and sends a weighted mix of requests from concurrent keep-alive
+clients (one connection each). Reports latency percentiles, error rates and bytes per route and
+writes the numbers to a JSON report.
+
+Without --url it starts test-landing.py on a free port; pass --url to
+load nginx, a deployment, or any other base URL. Against test-landing.py
+without a running Open WebUI the proxy route returns 502s; leave it out
+with --mix proxy=0.
+
+Usage:
+    python benchmarks/landing_load.py --requests 2000 --concurrency 32
+    python benchmarks/landing_load.py --url http://localhost:8080 --duration 30 --mix assets=50,proxy=10
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import random
+import re
+import ssl
+import subprocess
+import sys
+import time
+import urllib.parse
+from collections import Counter
+from pathlib import Path
+
+from landing_concurrency import ROOT, SERVER, free_port, wait_for
+
+NGINX_CONF = ROOT / "nginx.conf"
+
+# Report names for the nginx.conf locations; other locations keep their spec
+ROUTE_NAMES = {
+    "= /": "landing",
+    "/assets/": "assets",
+    "/brandfactory/": "brandfactory",
+    "/health": "health",
+    "/": "proxy",
+}
+IMAGE_ROUTE = "images"  # the `~* \.(jpg|...)$` location
+
+DEFAULT_MIX = {"landing": 10, "assets": 30, "images": 15, "brandfactory": 20, "health": 5, "proxy": 20}
+
+# Catch-all paths served by Open WebUI
+PROXY_PATHS = ["/workspace", "/api/config", "/api/version", "/manifest.json"]
+
+
+class Location:
+    """One nginx `location` block: modifier ('', '=', '~', '~*', '^~') and pattern"""
+
+    def __init__(self, modifier, pattern):
+        self.modifier = modifier
+        self.pattern = pattern
+        self.spec = f"{modifier} {pattern}".strip()
+        if modifier in ("~", "~*"):
+            self.regex = re.compile(pattern, re.IGNORECASE if modifier == "~*" else 0)
+            self.name = IMAGE_ROUTE if self.regex.search("/x.png") else self.spec
+        else:
+            self.regex = None
+            self.name = ROUTE_NAMES.get(self.spec, self.spec)
+
+
+def parse_locations(path=NGINX_CONF):
+    """`location` blocks of nginx.conf, in file order"""
+    text = re.sub(r"#.*", "", Path(path).read_text())
+    return [Location(modifier or "", pattern)
+            for modifier, pattern in re.findall(r"\blocation\s+(=|~\*|~|\^~)?\s*(\S+)\s*\{", text)]
+
+
+def match_location(locations, path):
+    """
+    The location nginx picks for `path`: an exact match, else the longest
+    prefix unless it is `^~`, then the first matching regex, else that prefix.
+    """
+    for location in locations:
+        if location.modifier == "=" and location.pattern == path:
+            return location
+    prefixes = [l for l in locations if l.modifier in ("", "^~") and path.startswith(l.pattern)]
+    longest = max(prefixes, key=lambda l: len(l.pattern), default=None)
+    if longest is None or longest.modifier != "^~":
+        for location in locations:
+            if location.regex is not None and location.regex.search(path):
+                return location
+    return longest
+
+
+class Connection:
+    """
+    Minimal keep-alive HTTP/1.1 client on asyncio streams. A general client
+    (httpx, aiohttp) costs more CPU per request than the landing server
+    itself, so the generator, not the server, would be measured.
+    """
+
+    def __init__(self, base_url, timeout=60.0):
+        url = urllib.parse.urlsplit(base_url)
+        self.host = url.hostname
+        self.port = url.port or (443 if url.scheme == "https" else 80)
+        self.ssl = ssl.create_default_context() if url.scheme == "https" else None
+        self.host_header = url.netloc.encode()
+        self.timeout = timeout
+        self.reader = self.writer = None
+
+    async def get(self, path):
+        """(status, bytes on the wire, body) of a GET; reconnects when needed"""
+        return await asyncio.wait_for(self._get(path), self.timeout)
+
+    async def _get(self, path):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(
+                self.host, self.port, ssl=self.ssl, server_hostname=self.host if self.ssl else None)
+        try:
+            self.writer.write(b"GET %s HTTP/1.1\r\nHost: %s\r\nAccept-Encoding: gzip, br\r\n"
+                              b"User-Agent: landing-load\r\n\r\n" % (path.encode(), self.host_header))
+            head = await self.reader.readuntil(b"\r\n\r\n")
+            status_line, *lines = head.decode("latin-1").split("\r\n")
+            status = int(status_line.split(" ", 2)[1])
+            headers = {}
+            for line in lines:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            if "content-length" in headers:
+                body = await self.reader.readexactly(int(headers["content-length"]))
+            elif headers.get("transfer-encoding", "").lower() == "chunked":
+                body = await self._read_chunked()
+            else:
+                body = await self.reader.read()
+                headers["connection"] = "close"
+        except BaseException:
+            self.close()
+            raise
+        if headers.get("connection", "").lower() == "close":
+            self.close()
+        return status, len(head) + len(body), body
+
+    async def _read_chunked(self):
+        chunks = []
+        while True:
+            size = int((await self.reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            if size == 0:
+                while await self.reader.readuntil(b"\r\n") != b"\r\n":  # trailers
+                    pass
+                return b"".join(chunks)
+            chunks.append((await self.reader.readexactly(size + 2))[:-2])
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+async def discover_paths(base_url, locations):
+    """Route name -> request paths, classified by match_location"""
+    candidates = ["/", "/health", *PROXY_PATHS]
+    candidates += [f"/brandfactory/{p.name}" for p in sorted((ROOT / "static").iterdir())
+                   if p.is_file() and not p.name.startswith(".")]
+    conn = Connection(base_url, timeout=10.0)
+    try:
+        status, _, body = await conn.get("/")
+        if body[:2] == b"\x1f\x8b":
+            body = gzip.decompress(body)
+        index = body.decode("utf-8", "replace") if status == 200 else ""
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, EOFError):
+        index = ""
+    conn.close()
+    # The page's own assets; anything else it links to is left to the catch-all paths
+    references = re.findall(r'(?:src|href)="(/[^"?#]*)', index)
+
+    paths = {}
+    for path in dict.fromkeys(candidates + references):
+        location = match_location(locations, path)
+        if location is None or (path not in candidates and location.pattern == "/" and not location.modifier):
+            continue
+        paths.setdefault(location.name, []).append(path)
+    return paths
+
+
+class RouteStats:
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self.bytes = 0
+        self.statuses = Counter()
+
+    def report(self, elapsed):
+        ordered = sorted(self.latencies)
+
+        def pct(p):
+            return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] * 1000 if ordered else 0.0
+
+        count = len(ordered)
+        return {
+            "requests": count,
+            "errors": self.errors,
+            "error_rate": self.errors / count if count else 0.0,
+            "statuses": {str(status): n for status, n in sorted(self.statuses.items(), key=str)},
+            "bytes": self.bytes,
+            "bytes_per_request": self.bytes / count if count else 0.0,
+            "requests_per_second": count / elapsed if elapsed else 0.0,
+            "latency_ms": {"p50": pct(50), "p90": pct(90), "p95": pct(95), "p99": pct(99),
+                           "max": ordered[-1] * 1000 if ordered else 0.0},
+        }
+
+
+async def run_load(base_url, mix, paths, concurrency, requests, duration, seed):
+    """Send the mix from `concurrency` workers until `requests` are done or `duration` passes"""
+    routes = [name for name in mix if mix[name] > 0 and paths.get(name)]
+    weights = [mix[name] for name in routes]
+    stats = {name: RouteStats() for name in routes}
+    rng = random.Random(seed)
+    remaining = requests
+    deadline = time.perf_counter() + duration if duration else None
+
+    async def worker():
+        nonlocal remaining
+        conn = Connection(base_url)
+        while (deadline is None and remaining > 0) or (deadline is not None and time.perf_counter() < deadline):
+            remaining -= 1
+            route = rng.choices(routes, weights)[0]
+            path = rng.choice(paths[route])
+            route_stats = stats[route]
+            start = time.perf_counter()
+            try:
+                status, wire, _ = await conn.get(path)
+                route_stats.statuses[status] += 1
+                route_stats.bytes += wire
+                if status >= 400:
+                    route_stats.errors += 1
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError,
+                    asyncio.LimitOverrunError, ValueError) as e:
+                route_stats.statuses[type(e).__name__] += 1
+                route_stats.errors += 1
+            route_stats.latencies.append(time.perf_counter() - start)
+        conn.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - start, stats
+
+
+def parse_mix(value):
+    mix = dict(DEFAULT_MIX)
+    for part in filter(None, (value or "").split(",")):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--url", help="Base URL to load (default: start test-landing.py)")
+    parser.add_argument("--upstream", help="Open WebUI URL for the local test-landing.py proxy")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000, help="Total requests")
+    parser.add_argument("--duration", type=float, help="Run for this many seconds instead")
+    parser.add_argument("--mix", help="Route weights, e.g. assets=50,proxy=0 "
+                        f"(default {','.join(f'{k}={v}' for k, v in DEFAULT_MIX.items())})")
+    parser.add_argument("--nginx-conf", type=Path, default=NGINX_CONF)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=Path("landing_load.json"), help="JSON report")
+    args = parser.parse_args()
+
+    locations = parse_locations(args.nginx_conf)
+    mix = parse_mix(args.mix)
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        port = free_port()
+        command = [sys.executable, str(SERVER), "--host", "127.0.0.1", "--port", str(port), "--quiet"]
+        if args.upstream:
+            command += ["--upstream", args.upstream]
+        server = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        base_url = f"http://127.0.0.1:{port}"
+
+    async def run():
+        paths = await discover_paths(base_url, locations)
+        for name, weight in mix.items():
+            if weight > 0 and not paths.get(name):
+                print(f"  (no paths found for route '{name}'; skipped)")
+        return paths, await run_load(base_url, mix, paths, args.concurrency,
+                                     args.requests, args.duration, args.seed)
+
+    try:
+        if server is not None:
+            wait_for(port)
+        paths, (elapsed, stats) = asyncio.run(run())
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    routes = {name: route_stats.report(elapsed) for name, route_stats in stats.items()}
+    total = RouteStats()
+    for route_stats in stats.values():
+        total.latencies += route_stats.latencies
+        total.errors += route_stats.errors
+        total.bytes += route_stats.bytes
+        total.statuses.update(route_stats.statuses)
+
+    report = {
+        "base_url": base_url,
+        "concurrency": args.concurrency,
+        "elapsed": elapsed,
+        "mix": {name: mix[name] for name in stats},
+        "locations": {l.name: l.spec for l in locations},
+        "paths": paths,
+        "routes": routes,
+        "total": total.report(elapsed),
+    }
+    args.output.write_text(json.dumps(report, indent=2))
+
+    print(f"{base_url}: {report['total']['requests']} requests, {args.concurrency} concurrent, "
+          f"{elapsed:.2f}s ({report['total']['requests_per_second']:,.0f} req/s)\n")
+    print(f"  {'route':<14} {'reqs':>6} {'err %':>6} {'KB/req':>7} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7}")
+    for name, r in list(routes.items()) + [("total", report["total"])]:
+        latency = r["latency_ms"]
+        print(f"  {name:<14} {r['requests']:>6} {r['error_rate'] * 100:>6.1f} "
+              f"{r['bytes_per_request'] / 1024:>7.1f} {latency['p50']:>7.2f} "
+              f"{latency['p95']:>7.2f} {latency['p99']:>7.2f}")
+    print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark: quick-start-lite.py start-up cost
+
+Runs the CLI module under `python -X importtime` and reports the total
+import time plus the heaviest top-level imports, then measures wall time
+until the persona menu is printed. Exits non-zero when the import time
+exceeds --budget-ms, so it can guard against heavy imports creeping back
+into start-up.
+
+Usage:
+    python benchmarks/lite_startup.py --runs 5 --budget-ms 150
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SCRIPT = ROOT / "quick-start-lite.py"
+
+LOAD_MODULE = (
+    "import importlib.util; "
+    f"spec = importlib.util.spec_from_file_location('lite', {str(SCRIPT)!r}); "
+    "module = importlib.util.module_from_spec(spec); "
+    "spec.loader.exec_module(module)"
+)
+
+
+def import_times():
+    """Return {top-level module: cumulative microseconds} from -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", LOAD_MODULE],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Top-level imports are the ones without indentation
+        if not name.startswith("  "):
+            modules[name.strip()] = modules.get(name.strip(), 0) + int(cumulative)
+    return modules
+
+
+def time_to_menu():
+    """Seconds from process start until the persona menu is printed"""
+    env = {**os.environ, "PYTHONUNBUFFERED": "1"}
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, str(SCRIPT)], cwd=ROOT, env=env, text=True,
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+    )
+    elapsed = None
+    for line in process.stdout:
+        if line.startswith("Commands:") or "No personas found" in line:
+            elapsed = time.perf_counter() - start
+            break
+    process.communicate("quit\n", timeout=30)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="Heaviest imports to list")
+    parser.add_argument("--budget-ms", type=float, default=150.0,
+                        help="Fail if the median import time exceeds this")
+    args = parser.parse_args()
+
+    runs = [import_times() for _ in range(args.runs)]
+    totals = [sum(modules.values()) / 1000 for modules in runs]
+    median_total = statistics.median(totals)
+
+    print(f"Import time (median of {args.runs}): {median_total:.1f} ms\n")
+    print("Heaviest top-level imports (last run):")
+    for name, micros in sorted(runs[-1].items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {micros / 1000:8.1f} ms  {name}")
+
+    menu_times = [t for t in (time_to_menu() for _ in range(args.runs)) if t is not None]
+    if menu_times:
+        print(f"\nTime to persona menu (median): {statistics.median(menu_times) * 1000:.1f} ms")
+
+    if median_total > args.budget_ms:
+        print(f"\n✗ Import time {median_total:.1f} ms exceeds budget {args.budget_ms:.0f} ms")
+        sys.exit(1)
+    print(f"\n✓ Within {args.budget_ms:.0f} ms budget")
+
+
+if __name__ == "__main__":
+    main()
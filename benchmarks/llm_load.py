@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark: offline load test of the LLM provider layer
+
+Routes every model to the fake provider (LLM_PROVIDER=fake) and runs
+many panel-style requests and workflow runs concurrently, reporting
+throughput and latency percentiles. Shows the effect of the per-provider
+concurrency limit without network access or API keys.
+
+Usage:
+    python benchmarks/llm_load.py --requests 200 --concurrency 8 --latency-ms 50
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def load_router(router, requests):
+    """Fire `requests` single completions at once and time each one, queueing included"""
+    async def one(i):
+        sent = time.perf_counter()
+        await router.complete(
+            "gpt-4",
+            [{"role": "system", "content": "You are a test persona."},
+             {"role": "user", "content": f"Request {i}"}],
+        )
+        return time.perf_counter() - sent
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(one(i) for i in range(requests)))
+    return time.perf_counter() - start, latencies
+
+
+async def load_workflows(engine, runs):
+    """Run every configured workflow `runs` times concurrently"""
+    jobs = [engine.run(name, f"Load test {i}") for i in range(runs) for name in engine.workflows]
+    start = time.perf_counter()
+    results = await asyncio.gather(*jobs)
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8, help="Fake provider max_concurrency")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--tokens-per-second", type=float, default=0, help="0 = no per-token delay")
+    parser.add_argument("--workflow-runs", type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ["LLM_PROVIDER"] = "fake"
+    os.environ["LLM_FAKE_LATENCY"] = str(args.latency_ms / 1000)
+    os.environ["LLM_FAKE_TOKENS_PER_SECOND"] = str(args.tokens_per_second)
+
+    from multi_agent.llm import LLMRouter
+    from multi_agent.orchestrator import WorkflowEngine
+
+    router = LLMRouter.from_config()
+    router.route("gpt-4").max_concurrency = args.concurrency
+
+    async def run():
+        elapsed, latencies = await load_router(router, args.requests)
+        print(f"{args.requests} completions, max {args.concurrency} in flight: "
+              f"{elapsed:.2f}s ({args.requests / elapsed:.0f} req/s)")
+        print(f"  latency p50 {statistics.median(latencies) * 1000:.0f} ms · "
+              f"p95 {percentile(latencies, 95) * 1000:.0f} ms · "
+              f"p99 {percentile(latencies, 99) * 1000:.0f} ms")
+
+        engine = WorkflowEngine(router=router)
+        engine.n8n_enabled = False
+        elapsed, results = await load_workflows(engine, args.workflow_runs)
+        failed = sum(not r.success for r in results)
+        print(f"\n{len(results)} workflow runs ({len(engine.workflows)} workflows x "
+              f"{args.workflow_runs}): {elapsed:.2f}s, {failed} failed")
+        await router.aclose()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Tools.get_youtube_transcript latency against stub loaders
+
+Replaces the langchain YouTube loaders with local stubs that sleep for a
+fixed time, then compares the sequential fetch (details, then transcript)
+with the concurrent one now used by Tools/youtube_transcript_fixed.py.
+Runs offline.
+
+Usage:
+    python benchmarks/transcript_concurrency.py --details-ms 400 --transcript-ms 600
+"""
+
+import argparse
+import asyncio
+import enum
+import importlib.util
+import statistics
+import sys
+import time
+import types
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DELAYS = {"details": 0.4, "transcript": 0.6}
+
+
+class StubDocument:
+    def __init__(self, page_content, metadata=None):
+        self.page_content = page_content
+        self.metadata = metadata or {}
+
+
+class StubLoaderDL:
+    """Stands in for langchain_yt_dlp YoutubeLoaderDL"""
+
+    @classmethod
+    def from_youtube_url(cls, url, **kwargs):
+        return cls()
+
+    async def aload(self):
+        await asyncio.sleep(DELAYS["details"])
+        return [StubDocument("", {"title": "Stub Video", "author": "Stub Channel"})]
+
+
+class StubLoader:
+    """Stands in for langchain_community YoutubeLoader"""
+
+    @classmethod
+    def from_youtube_url(cls, url, **kwargs):
+        return cls()
+
+    async def aload(self):
+        await asyncio.sleep(DELAYS["transcript"])
+        return [
+            StubDocument("stub transcript line %d" % i, {"start_seconds": i * 30})
+            for i in range(50)
+        ]
+
+
+def load_tools():
+    """Load the tool module with the stub loaders installed"""
+    community = types.ModuleType("langchain_community.document_loaders")
+    community.YoutubeLoader = StubLoader
+    community_youtube = types.ModuleType("langchain_community.document_loaders.youtube")
+    community_youtube.TranscriptFormat = enum.Enum("TranscriptFormat", "TEXT LINES CHUNKS")
+    yt_dlp_loader = types.ModuleType("langchain_yt_dlp.youtube_loader")
+    yt_dlp_loader.YoutubeLoaderDL = StubLoaderDL
+    sys.modules.setdefault("langchain_community", types.ModuleType("langchain_community"))
+    sys.modules.setdefault("langchain_yt_dlp", types.ModuleType("langchain_yt_dlp"))
+    sys.modules["langchain_community.document_loaders"] = community
+    sys.modules["langchain_community.document_loaders.youtube"] = community_youtube
+    sys.modules["langchain_yt_dlp.youtube_loader"] = yt_dlp_loader
+
+    spec = importlib.util.spec_from_file_location(
+        "youtube_transcript_fixed", ROOT / "Tools" / "youtube_transcript_fixed.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+async def sequential_fetch(url):
+    """The previous behaviour: details first, then transcript"""
+    await StubLoaderDL.from_youtube_url(url, add_video_info=True).aload()
+    return await StubLoader.from_youtube_url(url, add_video_info=False).aload()
+
+
+async def measure(label, make_call, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await make_call()
+        timings.append(time.perf_counter() - start)
+    print(f"{label:<12} median={statistics.median(timings)*1000:7.1f}ms  "
+          f"min={min(timings)*1000:7.1f}ms")
+
+
+async def run(runs):
+    module = load_tools()
+    url = "https://www.youtube.com/watch?v=stubvideo01"
+    events = []
+
+    async def record(event):
+        events.append((time.perf_counter(), event["data"]["description"]))
+
+    await measure("sequential", lambda: sequential_fetch(url), runs)
+    def fresh_tools():
+        # A fresh Tools per run so the transcript cache does not hide the
+        # fetch, and no writes to the search index
+        tools = module.Tools()
+        tools.valves.INDEX_TRANSCRIPTS = False
+        return tools
+
+    await measure(
+        "concurrent", lambda: fresh_tools().get_youtube_transcript(url, record, {}), runs
+    )
+
+    print("\nProgress events (last run):")
+    last_run = events[-4:]
+    for stamp, description in last_run:
+        print(f"  +{(stamp - last_run[0][0])*1000:6.1f}ms  {description}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--details-ms", type=int, default=400)
+    parser.add_argument("--transcript-ms", type=int, default=600)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    DELAYS["details"] = args.details_ms / 1000
+    DELAYS["transcript"] = args.transcript_ms / 1000
+    asyncio.run(run(args.runs))
+
+
+if __name__ == "__main__":
+    main()
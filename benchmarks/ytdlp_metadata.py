@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark: time-to-first-transcript for the YouTube transcript filter
+
+Compares the old path (new YoutubeDL per message + full extract_info)
+against the lightweight subtitle metadata path in
+functions/youtube_transcript.py. Needs network access to YouTube.
+
+Usage:
+    python benchmarks/ytdlp_metadata.py https://www.youtube.com/watch?v=<id> --runs 3
+"""
+
+import argparse
+import importlib.util
+import statistics
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def load_filter():
+    """Load the Filter class from the function file"""
+    spec = importlib.util.spec_from_file_location(
+        "youtube_transcript", ROOT / "functions" / "youtube_transcript.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.Filter()
+
+
+def full_extract_transcript(video_url):
+    """The previous behaviour: fresh YoutubeDL and full info extraction"""
+    import yt_dlp
+
+    ydl_opts = {
+        'writesubtitles': True,
+        'writeautomaticsub': True,
+        'subtitleslangs': ['en', 'en-US', 'en-GB'],
+        'skip_download': True,
+        'quiet': True,
+        'no_warnings': True,
+    }
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(video_url, download=False)
+    return info.get('subtitles', {}) or info.get('automatic_captions', {})
+
+
+def time_runs(label, fn, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    print(f"{label:<32} first={timings[0]*1000:8.0f}ms  "
+          f"median={statistics.median(timings)*1000:8.0f}ms  "
+          f"min={min(timings)*1000:8.0f}ms")
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("url", help="YouTube video URL with English captions")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per variant")
+    args = parser.parse_args()
+
+    video_filter = load_filter()
+
+    print(f"Video: {args.url}  ({args.runs} runs each)\n")
+    time_runs("full extract_info (metadata)", lambda: full_extract_transcript(args.url), args.runs)
+    time_runs("subtitle metadata (reused ydl)", lambda: video_filter.get_subtitle_metadata(args.url), args.runs)
+    print()
+
+    result = {}
+
+    def first_transcript():
+        result.update(video_filter.get_transcript_ytdlp(args.url))
+
+    time_runs("time-to-first-transcript", first_transcript, args.runs)
+    if not result.get('success'):
+        print(f"\n⚠️  Transcript not retrieved: {result.get('error')}")
+
+
+if __name__ == "__main__":
+    main()
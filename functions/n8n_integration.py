@@ -5,16 +5,76 @@ Enables seamless integration with n8n workflows
 
 import httpx
 import json
+import time
 from typing import Optional, Dict, Any
 import os
 
+try:
+    from multi_agent.metrics import get_recorder
+except ImportError:  # installed in Open WebUI without the repo on the path
+    get_recorder = None
+
+try:
+    from multi_agent.config import Settings, load_config
+except ImportError:
+    Settings = load_config = None
+
+try:
+    from multi_agent.timeouts import get_timeouts
+except ImportError:
+    get_timeouts = None
+
 
 class N8NIntegration:
     """Integration class for n8n workflows"""
 
-    def __init__(self, base_url: str = None):
-        self.base_url = base_url or os.getenv("N8N_BASE_URL", "http://localhost:5678")
-        self.timeout = 30.0
+    def __init__(self, base_url: str = None, settings: Optional["Settings"] = None):
+        # Frozen config.yaml snapshot; without the repo, fall back to the environment
+        self.settings = settings or (load_config() if load_config else None)
+        if base_url:
+            self.base_url = base_url
+        elif self.settings:
+            self.base_url = self.settings.n8n.base_url
+        else:
+            self.base_url = os.getenv("N8N_BASE_URL", "http://localhost:5678")
+        self.timeout = 30.0  # upper bound; adaptive timeouts may tighten it per endpoint
+        self.metrics = get_recorder() if get_recorder else None
+        self.timeouts = get_timeouts() if get_timeouts else None
+
+    def _webhook_for(self, path: str):
+        """The config.yaml n8n.webhooks entry for `path`, if there is one"""
+        if self.settings:
+            for hook in self.settings.n8n.webhooks:
+                if hook.endpoint == path:
+                    return hook
+        return None
+
+    def _timeout_for(self, path: str) -> float:
+        """The config.yaml timeout of the webhook at `path`, else self.timeout"""
+        hook = self._webhook_for(path)
+        return hook.timeout if hook else self.timeout
+
+    async def _request(self, client: httpx.AsyncClient, method: str, url: str,
+                       ceiling: float, **kwargs) -> httpx.Response:
+        """One request, with per-endpoint timeouts when multi_agent.timeouts is available"""
+        if not self.timeouts:
+            return await client.request(method, url, timeout=ceiling, **kwargs)
+        timer = self.timeouts.start(url, ceiling)
+        try:
+            response = await client.request(method, url, timeout=timer.timeout,
+                                            extensions=timer.extensions, **kwargs)
+        except httpx.HTTPError as e:
+            timer.done(e)
+            raise
+        timer.done()
+        return response
+
+    def _record(self, webhook_path: str, started: float, success: bool):
+        """Add one webhook call to the usage metrics (under its config.yaml name), if available"""
+        if self.metrics:
+            hook = self._webhook_for(webhook_path)
+            self.metrics.record_webhook(hook.name if hook else webhook_path,
+                                        time.perf_counter() - started, success=success)
 
     async def trigger_workflow(
         self,
@@ -34,17 +94,20 @@ class N8NIntegration:
             Dictionary with response data or error information
         """
         url = f"{self.base_url}{webhook_path}"
+        ceiling = self._timeout_for(webhook_path)
+        started = time.perf_counter()
 
         try:
             async with httpx.AsyncClient(timeout=self.timeout) as client:
                 if method.upper() == "POST":
-                    response = await client.post(url, json=data)
+                    response = await self._request(client, "POST", url, ceiling, json=data)
                 elif method.upper() == "GET":
-                    response = await client.get(url, params=data)
+                    response = await self._request(client, "GET", url, ceiling, params=data)
                 else:
                     return {"error": f"Unsupported HTTP method: {method}"}
 
                 response.raise_for_status()
+                self._record(webhook_path, started, success=True)
 
                 return {
                     "success": True,
@@ -54,12 +117,14 @@ class N8NIntegration:
                 }
 
         except httpx.HTTPError as e:
+            self._record(webhook_path, started, success=False)
             return {
                 "success": False,
                 "error": str(e),
                 "error_type": type(e).__name__
             }
         except Exception as e:
+            self._record(webhook_path, started, success=False)
             return {
                 "success": False,
                 "error": str(e),
@@ -80,7 +145,7 @@ class N8NIntegration:
 
         try:
             async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(url)
+                response = await self._request(client, "GET", url, self.timeout)
                 response.raise_for_status()
 
                 return {
@@ -8,10 +8,192 @@ required_open_webui_version: 0.3.0
 
 import httpx
 import json
-from typing import Optional, Dict, Any
+import time
+import socket
+import ssl
+import asyncio
+from collections import deque
+from typing import Optional, Dict, Any, NamedTuple
+from urllib.parse import urlsplit
 from datetime import datetime
 from pydantic import BaseModel, Field
 
+try:
+    from multi_agent.metrics import get_recorder
+except ImportError:  # running inside Open WebUI without the repo on the path
+    get_recorder = None
+
+try:
+    from multi_agent.timeouts import get_timeouts
+except ImportError:
+    get_timeouts = None
+
+
+class ProbeResult(NamedTuple):
+    """One health probe; phase times in seconds (tls is None for http)"""
+    timestamp: float
+    status: Optional[int]
+    dns: Optional[float] = None
+    connect: Optional[float] = None
+    tls: Optional[float] = None
+    first_byte: Optional[float] = None  # request sent -> first response byte
+    total: Optional[float] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status is not None and self.status < 400
+
+
+def _percentile(values, pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class WebhookProbe:
+    """
+    Health probe for one webhook URL.
+
+    Sends a CORS preflight (OPTIONS), which n8n answers from its webhook
+    registry without executing the workflow, over a raw connection so DNS,
+    TCP connect, TLS handshake and time to first byte are timed separately.
+    The last `history` results are kept for availability and percentiles;
+    start() probes in the background every `interval` seconds so callers
+    can read summary() without waiting on the network.
+    """
+
+    PHASES = ("dns", "connect", "tls", "first_byte", "total")
+
+    def __init__(self, url: str, method: str = "GET", timeout: float = 10.0, history: int = 100):
+        self.url = url
+        self.method = method
+        self.timeout = timeout
+        self.results = deque(maxlen=history)
+        self._task: Optional[asyncio.Task] = None
+        self._interval: Optional[float] = None
+
+    async def _measure(self) -> ProbeResult:
+        parts = urlsplit(self.url)
+        https = parts.scheme == "https"
+        port = parts.port or (443 if https else 80)
+        path = parts.path or "/"
+        if parts.query:
+            path += f"?{parts.query}"
+        loop = asyncio.get_running_loop()
+
+        started = mark = time.perf_counter()
+        infos = await loop.getaddrinfo(parts.hostname, port, type=socket.SOCK_STREAM)
+        now = time.perf_counter()
+        dns, mark = now - mark, now
+
+        address = infos[0][4]
+        reader, writer = await asyncio.open_connection(address[0], address[1])
+        try:
+            now = time.perf_counter()
+            connect, mark = now - mark, now
+            tls = None
+            if https:
+                await writer.start_tls(ssl.create_default_context(), server_hostname=parts.hostname)
+                now = time.perf_counter()
+                tls, mark = now - mark, now
+
+            writer.write(
+                f"OPTIONS {path} HTTP/1.1\r\n"
+                f"Host: {parts.netloc}\r\n"
+                f"Origin: {parts.scheme}://{parts.netloc}\r\n"
+                f"Access-Control-Request-Method: {self.method}\r\n"
+                "User-Agent: OpenWebUI-HealthProbe/1.0\r\n"
+                "Connection: close\r\n\r\n".encode()
+            )
+            await writer.drain()
+            mark = time.perf_counter()
+            first = await reader.readexactly(1)
+            now = time.perf_counter()
+            first_byte = now - mark
+            status_line = first + await reader.readline()
+        finally:
+            writer.close()
+
+        return ProbeResult(
+            timestamp=time.time(),
+            status=int(status_line.split()[1]),
+            dns=dns, connect=connect, tls=tls, first_byte=first_byte,
+            total=now - started,
+        )
+
+    async def probe(self) -> ProbeResult:
+        """Run one probe now and add it to the history"""
+        try:
+            result = await asyncio.wait_for(self._measure(), self.timeout)
+        except asyncio.TimeoutError:
+            result = ProbeResult(time.time(), None, error=f"no response within {self.timeout:g}s")
+        except (OSError, ValueError, IndexError, asyncio.IncompleteReadError) as e:
+            result = ProbeResult(time.time(), None, error=f"{type(e).__name__}: {e}")
+        self.results.append(result)
+        return result
+
+    def age(self) -> Optional[float]:
+        """Seconds since the last probe, None if there was none"""
+        return time.time() - self.results[-1].timestamp if self.results else None
+
+    def summary(self) -> Dict[str, Any]:
+        """Availability and per-phase p50/p95/p99 over the history (no network I/O)"""
+        results = list(self.results)
+        ok = [result for result in results if result.ok]
+        return {
+            "url": self.url,
+            "probes": len(results),
+            "availability": len(ok) / len(results) if results else 0.0,
+            "age": self.age(),
+            "last": results[-1]._asdict() if results else None,
+            "latency": {
+                phase: {
+                    f"p{pct}": _percentile([getattr(r, phase) for r in ok if getattr(r, phase) is not None], pct)
+                    for pct in (50, 95, 99)
+                }
+                for phase in self.PHASES
+            },
+        }
+
+    async def _run(self, interval: float):
+        while True:
+            # Skip a probe that a caller just ran
+            age = self.age()
+            if age is not None and age < interval:
+                await asyncio.sleep(interval - age)
+            await self.probe()
+
+    def start(self, interval: float):
+        """Probe every `interval` seconds in the background (restarts if the interval changed)"""
+        if self._task and not self._task.done() and self._interval == interval:
+            return
+        self.stop()
+        self._interval = interval
+        self._task = asyncio.get_running_loop().create_task(self._run(interval))
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+
+_probes: Dict[str, WebhookProbe] = {}
+
+
+def get_probe(url: str, timeout: float = 10.0) -> WebhookProbe:
+    """
+    Return the process-wide probe (and its history) for a webhook URL.
+    Probes of any other URL (the valve changed) are stopped and dropped.
+    """
+    for other in [key for key in _probes if key != url]:
+        _probes.pop(other).stop()
+    probe = _probes.get(url)
+    if probe is None:
+        probe = _probes[url] = WebhookProbe(url, timeout=timeout)
+    return probe
+
 
 class Tools:
     class Valves(BaseModel):
@@ -21,11 +203,43 @@ class Tools:
         )
         request_timeout: int = Field(
             default=30,
-            description="Request timeout in seconds"
+            description="Request timeout in seconds (upper bound when adaptive timeouts are on)"
+        )
+        probe_interval: int = Field(
+            default=0,
+            description="Seconds between background health probes of the webhook (0 = probe on demand)"
+        )
+        probe_max_age: int = Field(
+            default=30,
+            description="Reuse a health probe result for up to this many seconds"
         )
 
     def __init__(self):
         self.valves = self.Valves()
+        self.metrics = get_recorder() if get_recorder else None
+        self.timeouts = get_timeouts() if get_timeouts else None
+
+    async def _request(self, client: httpx.AsyncClient, method: str, ceiling: float, **kwargs) -> httpx.Response:
+        """One request to the webhook, with adaptive timeouts when multi_agent.timeouts is available"""
+        url = self.valves.n8n_webhook_url
+        if not self.timeouts:
+            return await client.request(method, url, timeout=ceiling, **kwargs)
+        timer = self.timeouts.start(url, ceiling)
+        try:
+            response = await client.request(method, url, timeout=timer.timeout,
+                                            extensions=timer.extensions, **kwargs)
+        except httpx.HTTPError as e:
+            timer.done(e)
+            raise
+        timer.done()
+        return response
+
+    def _record(self, name: str, started: float, success: bool) -> float:
+        """Add one webhook call to the usage metrics (if available); returns its duration"""
+        duration = time.perf_counter() - started
+        if self.metrics:
+            self.metrics.record_webhook(name, duration, success=success)
+        return duration
 
     async def trigger_n8n_workflow(
         self,
@@ -57,13 +271,15 @@ class Tools:
             **extra_data
         }
 
+        started = time.perf_counter()
         try:
             async with httpx.AsyncClient(timeout=self.valves.request_timeout) as client:
-                response = await client.get(
-                    self.valves.n8n_webhook_url,
+                response = await self._request(
+                    client, "GET", self.valves.request_timeout,
                     params=params
                 )
                 response.raise_for_status()
+                duration = self._record("n8n_webhook_trigger", started, success=True)
 
                 # Try to parse JSON response
                 try:
@@ -79,9 +295,11 @@ class Tools:
 {result_text}
 
 🆔 Status: {response.status_code}
+⏱️ Took: {duration:.2f}s
 ⏰ Time: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC"""
 
         except httpx.HTTPError as e:
+            self._record("n8n_webhook_trigger", started, success=False)
             return f"""❌ Failed to trigger n8n workflow
 
 Error: {str(e)}
@@ -93,6 +311,7 @@ Please check:
 3. n8n service is running"""
 
         except Exception as e:
+            self._record("n8n_webhook_trigger", started, success=False)
             return f"""❌ Unexpected error
 
 Error: {str(e)}
@@ -120,13 +339,15 @@ Please check your n8n configuration."""
         payload["triggered_by"] = __user__.get("name", "Anonymous")
         payload["timestamp"] = datetime.utcnow().isoformat()
 
+        started = time.perf_counter()
         try:
             async with httpx.AsyncClient(timeout=self.valves.request_timeout) as client:
-                response = await client.post(
-                    self.valves.n8n_webhook_url,
+                response = await self._request(
+                    client, "POST", self.valves.request_timeout,
                     json=payload
                 )
                 response.raise_for_status()
+                duration = self._record("n8n_webhook_trigger_post", started, success=True)
 
                 try:
                     result = response.json()
@@ -140,9 +361,11 @@ Please check your n8n configuration."""
 📥 Response:
 {result_text}
 
-🆔 Status: {response.status_code}"""
+🆔 Status: {response.status_code}
+⏱️ Took: {duration:.2f}s"""
 
         except httpx.HTTPError as e:
+            self._record("n8n_webhook_trigger_post", started, success=False)
             return f"""❌ Failed to trigger workflow
 
 Error: {str(e)}"""
@@ -152,40 +375,50 @@ Error: {str(e)}"""
         __user__: dict = {}
     ) -> str:
         """
-        Check if n8n webhook is reachable
+        Check if n8n webhook is reachable, with measured latency
 
-        :return: Status of n8n webhook
+        :return: Availability and latency percentiles of the n8n webhook
         """
 
-        try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(
-                    self.valves.n8n_webhook_url,
-                    params={"test": "connection"}
-                )
-
-                return f"""✅ n8n Webhook is Reachable!
-
-🔗 URL: {self.valves.n8n_webhook_url}
-📊 Status Code: {response.status_code}
-⏱️ Response Time: Fast
-
-Your workflow is ready to use!"""
-
-        except httpx.HTTPError as e:
+        probe = get_probe(self.valves.n8n_webhook_url, timeout=10.0)
+        age = probe.age()
+        if age is None or age > self.valves.probe_max_age:
+            await probe.probe()
+        if self.valves.probe_interval > 0:
+            probe.start(self.valves.probe_interval)
+        else:
+            probe.stop()
+
+        summary = probe.summary()
+        last = summary["last"]
+        if last["error"] or last["status"] >= 400:
+            problem = last["error"] or f"HTTP {last['status']} (webhook not registered?)"
             return f"""⚠️ n8n Webhook Check Failed
 
-🔗 URL: {self.valves.n8n_webhook_url}
-❌ Error: {str(e)}
+🔗 URL: {summary['url']}
+❌ Error: {problem}
+📈 Availability: {summary['availability']:.0%} of last {summary['probes']} probes
 
 Possible issues:
 1. n8n workflow is not active
 2. Webhook URL might be incorrect
 3. Network connectivity issues"""
 
-        except Exception as e:
-            return f"""❌ Connection Error
+        def ms(value):
+            return f"{value * 1000:.0f} ms" if value is not None else "n/a"
 
-Error: {str(e)}
+        phases = "\n".join(
+            f"   {phase:<10} p50 {ms(stats['p50'])} · p95 {ms(stats['p95'])} · p99 {ms(stats['p99'])}"
+            for phase, stats in summary["latency"].items() if stats["p50"] is not None
+        )
+        return f"""✅ n8n Webhook is Reachable!
 
-Please verify your n8n webhook URL."""
+🔗 URL: {summary['url']}
+📊 Status Code: {last['status']} (preflight, workflow not executed)
+⏱️ Last probe: DNS {ms(last['dns'])} · connect {ms(last['connect'])} · TLS {ms(last['tls'])} · first byte {ms(last['first_byte'])}
+📈 Availability: {summary['availability']:.0%} of last {summary['probes']} probes
+📉 Latency over successful probes:
+{phases}
+🕑 Measured {summary['age']:.0f}s ago
+
+Your workflow is ready to use!"""
@@ -3,24 +3,71 @@ OpenWebUI Webhook Manager
 Handles both incoming and outgoing webhooks for multi-agent workflows
 """
 
+import asyncio
 import httpx
 import json
 import hashlib
 import hmac
+import time
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 import os
 from pydantic import BaseModel, Field
 
+try:
+    from multi_agent.metrics import get_recorder
+except ImportError:  # installed in Open WebUI without the repo on the path
+    get_recorder = None
+
+try:
+    from multi_agent.config import Settings, load_config
+except ImportError:
+    Settings = load_config = None
+
+try:
+    from multi_agent.timeouts import get_timeouts
+except ImportError:
+    get_timeouts = None
+
+
+# n8n.webhooks from config.yaml, used when the repo (and so config.yaml)
+# is not available
+DEFAULT_WEBHOOKS = [
+    {"name": "content_generation", "endpoint": "/webhook/content-gen",
+     "display_name": "Content Generation", "timeout": 60},
+    {"name": "social_media_scheduler", "endpoint": "/webhook/social-scheduler",
+     "display_name": "Social Media Post", "retries": 1},
+    {"name": "analytics_processor", "endpoint": "/webhook/analytics",
+     "display_name": "Fetch Analytics", "timeout": 15, "retries": 2, "cache_ttl": 300},
+    {"name": "media_processor", "endpoint": "/webhook/media-process",
+     "display_name": "Media Processing", "timeout": 120},
+    {"name": "campaign", "endpoint": "/webhook/campaign", "display_name": "Campaign Workflow"},
+]
+
+# Webhook names from before the registry was read from config.yaml
+LEGACY_NAMES = {
+    "n8n_content_gen": "content_generation",
+    "n8n_social_post": "social_media_scheduler",
+    "n8n_analytics": "analytics_processor",
+    "n8n_media_process": "media_processor",
+    "n8n_campaign": "campaign",
+}
+
+# Payload fields that differ on every call and are left out of cache keys
+VOLATILE_FIELDS = {"timestamp", "_timestamp", "requested_by", "_triggered_by"}
+
 
 class WebhookConfig(BaseModel):
     """Configuration for a webhook endpoint"""
     name: str = Field(description="Friendly name for the webhook")
+    key: Optional[str] = Field(default=None, description="Registry name, used for usage metrics")
     url: str = Field(description="Target URL for outgoing webhooks")
     method: str = Field(default="POST", description="HTTP method")
     headers: Optional[Dict[str, str]] = Field(default_factory=dict)
     secret: Optional[str] = Field(default=None, description="Secret for HMAC signature")
-    timeout: int = Field(default=30, description="Request timeout in seconds")
+    timeout: float = Field(default=30, description="Request timeout in seconds")
+    retries: int = Field(default=0, description="Extra attempts after a retryable failure")
+    cache_ttl: float = Field(default=0, description="Seconds to reuse a successful response (read-only webhooks)")
 
 
 class WebhookLog(BaseModel):
@@ -32,6 +79,45 @@ class WebhookLog(BaseModel):
     payload: Dict[str, Any]
     response: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
+    duration: Optional[float] = None  # seconds
+    timeouts: Optional[Dict[str, float]] = None  # connect/read/write/pool used by the last attempt
+
+
+class WebhookRegistry:
+    """
+    Immutable name -> WebhookConfig index built from n8n.webhooks.
+    A reload builds a new registry and swaps it in, so a request that
+    already looked up its config finishes against the old one.
+    """
+
+    def __init__(self, webhooks: Dict[str, WebhookConfig], source: Any = None):
+        self.webhooks = webhooks
+        self.source = source  # the Settings snapshot it was built from
+
+    @classmethod
+    def from_entries(cls, base_url: str, entries: List[Any], source: Any = None) -> "WebhookRegistry":
+        """Build from WebhookSettings models or DEFAULT_WEBHOOKS-style dicts"""
+        base_url = base_url.rstrip("/")
+        webhooks = {}
+        for entry in entries:
+            hook = entry if isinstance(entry, dict) else entry.model_dump()
+            webhooks[hook["name"]] = WebhookConfig(
+                name=hook.get("display_name") or hook["name"].replace("_", " ").title(),
+                key=hook["name"],
+                url=f"{base_url}{hook['endpoint']}",
+                method=hook.get("method", "POST").upper(),
+                timeout=hook.get("timeout", 30),
+                retries=hook.get("retries", 0),
+                cache_ttl=hook.get("cache_ttl", 0),
+            )
+        return cls(webhooks, source)
+
+    @classmethod
+    def from_settings(cls, settings: "Settings") -> "WebhookRegistry":
+        return cls.from_entries(settings.n8n.base_url, settings.n8n.webhooks, settings)
+
+    def get(self, name: str) -> Optional[WebhookConfig]:
+        return self.webhooks.get(LEGACY_NAMES.get(name, name))
 
 
 class WebhookManager:
@@ -40,40 +126,59 @@ class WebhookManager:
     Supports n8n, Zapier, Make.com, and custom webhooks
     """
 
-    def __init__(self):
-        self.base_url = os.getenv("N8N_BASE_URL", "http://localhost:5678")
+    def __init__(self, settings: Optional["Settings"] = None, reload_interval: float = 2.0):
+        # Frozen config.yaml snapshot; without the repo, fall back to the environment.
+        # Only a manager that loaded config.yaml itself follows later edits to it
+        self.auto_reload = settings is None and load_config is not None
+        self.settings = settings or (load_config() if load_config else None)
+        if self.settings:
+            self.base_url = self.settings.n8n.base_url
+            self.registry = WebhookRegistry.from_settings(self.settings)
+        else:
+            self.base_url = os.getenv("N8N_BASE_URL", "http://localhost:5678")
+            self.registry = WebhookRegistry.from_entries(self.base_url, DEFAULT_WEBHOOKS)
+        self.reload_interval = reload_interval
+        self._last_reload_check = time.monotonic()
         self.timeout = 30.0
         self.logs: List[WebhookLog] = []
         self.max_logs = 100
+        self.metrics = get_recorder() if get_recorder else None
+        # Per-endpoint connect/read/pool timeouts (config.yaml n8n.adaptive_timeouts)
+        self.timeouts = get_timeouts() if get_timeouts else None
+        self._cache: Dict[str, tuple] = {}  # key -> (expires, result)
+        self.max_cache_entries = 128
 
-        # Predefined webhook configurations
-        self.webhooks = {
-            "n8n_content_gen": WebhookConfig(
-                name="Content Generation",
-                url=f"{self.base_url}/webhook/content-generation",
-                method="POST"
-            ),
-            "n8n_social_post": WebhookConfig(
-                name="Social Media Post",
-                url=f"{self.base_url}/webhook/social-post",
-                method="POST"
-            ),
-            "n8n_analytics": WebhookConfig(
-                name="Fetch Analytics",
-                url=f"{self.base_url}/webhook/analytics",
-                method="GET"
-            ),
-            "n8n_media_process": WebhookConfig(
-                name="Media Processing",
-                url=f"{self.base_url}/webhook/media-process",
-                method="POST"
-            ),
-            "n8n_campaign": WebhookConfig(
-                name="Campaign Workflow",
-                url=f"{self.base_url}/webhook/campaign",
-                method="POST"
-            ),
-        }
+    @property
+    def webhooks(self) -> Dict[str, WebhookConfig]:
+        return self.registry.webhooks
+
+    def reload(self, settings: Optional["Settings"] = None) -> bool:
+        """
+        Swap in a registry for `settings`, or for config.yaml if it changed
+        since the last check. Returns True if the registry was replaced.
+        """
+        if settings is None:
+            if not self.auto_reload:
+                return False
+            settings = load_config()
+        if settings is self.registry.source:
+            return False
+        self.settings = settings
+        self.base_url = settings.n8n.base_url
+        self.registry = WebhookRegistry.from_settings(settings)
+        return True
+
+    def _current_registry(self) -> WebhookRegistry:
+        # load_config() is a stat() when the file is unchanged; throttle even that
+        if self.auto_reload:
+            now = time.monotonic()
+            if now - self._last_reload_check >= self.reload_interval:
+                self._last_reload_check = now
+                try:
+                    self.reload()
+                except Exception as e:  # keep the last good registry on a bad edit
+                    print(f"⚠️  Could not reload webhooks from config.yaml: {e}")
+        return self.registry
 
     def _generate_signature(self, payload: str, secret: str) -> str:
         """Generate HMAC signature for webhook security"""
@@ -83,13 +188,43 @@ class WebhookManager:
             hashlib.sha256
         ).hexdigest()
 
-    def _log_webhook(self, log_entry: WebhookLog):
-        """Add webhook activity to log"""
+    def _log_webhook(self, log_entry: WebhookLog, config: WebhookConfig):
+        """Add webhook activity to log and usage metrics (keyed by registry name)"""
+        if self.metrics and log_entry.duration is not None:
+            self.metrics.record_webhook(
+                config.key or config.name, log_entry.duration,
+                success=log_entry.status == "success"
+            )
         self.logs.append(log_entry)
         # Keep only recent logs
         if len(self.logs) > self.max_logs:
             self.logs = self.logs[-self.max_logs:]
 
+    def _cache_key(self, config: WebhookConfig, payload: Dict[str, Any]) -> str:
+        stable = {key: value for key, value in payload.items() if key not in VOLATILE_FIELDS}
+        return f"{config.method} {config.url} {json.dumps(stable, sort_keys=True, default=str)}"
+
+    def _cache_put(self, key: str, ttl: float, result: Dict[str, Any]):
+        now = time.monotonic()
+        if len(self._cache) >= self.max_cache_entries:
+            self._cache = {k: v for k, v in self._cache.items() if v[0] > now}
+            while len(self._cache) >= self.max_cache_entries:
+                self._cache.pop(next(iter(self._cache)))
+        self._cache[key] = (now + ttl, result)
+
+    @staticmethod
+    def _retryable(config: WebhookConfig, error: httpx.HTTPError) -> bool:
+        # A request that never connected is safe to repeat; anything else
+        # may already have started a workflow, so it is only retried for
+        # GETs and webhooks marked read-only by a cache_ttl
+        if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout)):
+            return True
+        if config.method != "GET" and config.cache_ttl <= 0:
+            return False
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code >= 500
+        return isinstance(error, (httpx.TimeoutException, httpx.RemoteProtocolError))
+
     async def send_webhook(
         self,
         webhook_name: str,
@@ -101,25 +236,35 @@ class WebhookManager:
         Send data to a webhook endpoint
 
         Args:
-            webhook_name: Name of predefined webhook or custom name
+            webhook_name: Name of a config.yaml n8n.webhooks entry or custom name
             payload: Data to send
             custom_url: Override URL for custom webhooks
             custom_headers: Additional headers
         """
         # Get webhook config
-        if webhook_name in self.webhooks:
-            config = self.webhooks[webhook_name]
-        elif custom_url:
+        config = self._current_registry().get(webhook_name)
+        if config is None:
+            if not custom_url:
+                return {
+                    "success": False,
+                    "error": f"Unknown webhook '{webhook_name}' and no custom_url provided"
+                }
             config = WebhookConfig(
                 name=webhook_name,
                 url=custom_url,
                 method="POST"
             )
-        else:
-            return {
-                "success": False,
-                "error": f"Unknown webhook '{webhook_name}' and no custom_url provided"
-            }
+
+        method = config.method.upper()
+        if method not in ("POST", "GET", "PUT"):
+            return {"success": False, "error": f"Unsupported method: {config.method}"}
+
+        cache_key = None
+        if config.cache_ttl > 0 and not custom_headers:
+            cache_key = self._cache_key(config, payload)
+            cached = self._cache.get(cache_key)
+            if cached and cached[0] > time.monotonic():
+                return {**cached[1], "cached": True}
 
         # Prepare headers
         headers = {
@@ -135,65 +280,91 @@ class WebhookManager:
             signature = self._generate_signature(payload_str, config.secret)
             headers["X-Webhook-Signature"] = signature
 
-        try:
-            async with httpx.AsyncClient(timeout=config.timeout) as client:
-                # Send request
-                if config.method.upper() == "POST":
-                    response = await client.post(config.url, json=payload, headers=headers)
-                elif config.method.upper() == "GET":
-                    response = await client.get(config.url, params=payload, headers=headers)
-                elif config.method.upper() == "PUT":
-                    response = await client.put(config.url, json=payload, headers=headers)
-                else:
-                    return {"success": False, "error": f"Unsupported method: {config.method}"}
-
-                response.raise_for_status()
-
-                # Parse response
+        started = time.perf_counter()
+        attempt = 0
+        async with httpx.AsyncClient(timeout=config.timeout) as client:
+            while True:
+                attempt += 1
+                timer = self.timeouts.start(config.url, config.timeout) if self.timeouts else None
+                request = {"headers": headers}
+                if timer:
+                    request.update(timeout=timer.timeout, extensions=timer.extensions)
                 try:
-                    response_data = response.json()
-                except:
-                    response_data = {"text": response.text}
-
-                result = {
-                    "success": True,
-                    "status_code": response.status_code,
-                    "data": response_data,
-                    "execution_id": response.headers.get("x-n8n-execution-id"),
-                    "webhook": config.name
-                }
-
-                # Log success
-                self._log_webhook(WebhookLog(
-                    timestamp=datetime.utcnow().isoformat(),
-                    webhook_name=config.name,
-                    direction="outgoing",
-                    status="success",
-                    payload=payload,
-                    response=result
-                ))
-
-                return result
-
-        except httpx.HTTPError as e:
-            error_result = {
-                "success": False,
-                "error": str(e),
-                "error_type": type(e).__name__,
-                "webhook": config.name
-            }
-
-            # Log error
-            self._log_webhook(WebhookLog(
-                timestamp=datetime.utcnow().isoformat(),
-                webhook_name=config.name,
-                direction="outgoing",
-                status="error",
-                payload=payload,
-                error=str(e)
-            ))
+                    # Send request
+                    if method == "POST":
+                        response = await client.post(config.url, json=payload, **request)
+                    elif method == "GET":
+                        response = await client.get(config.url, params=payload, **request)
+                    else:
+                        response = await client.put(config.url, json=payload, **request)
+                    if timer:
+                        timer.done()
+                    response.raise_for_status()
+                    break
+
+                except httpx.HTTPError as e:
+                    if timer and not isinstance(e, httpx.HTTPStatusError):
+                        timer.done(e)
+                    if attempt <= config.retries and self._retryable(config, e):
+                        await asyncio.sleep(0.5 * 2 ** (attempt - 1))
+                        continue
+
+                    error_result = {
+                        "success": False,
+                        "error": str(e),
+                        "error_type": type(e).__name__,
+                        "webhook": config.name,
+                        "attempts": attempt,
+                        "duration": time.perf_counter() - started,
+                        "timeouts": timer.timeout.as_dict() if timer else None
+                    }
+
+                    # Log error
+                    self._log_webhook(WebhookLog(
+                        timestamp=datetime.utcnow().isoformat(),
+                        webhook_name=config.name,
+                        direction="outgoing",
+                        status="error",
+                        payload=payload,
+                        error=str(e),
+                        duration=error_result["duration"],
+                        timeouts=error_result["timeouts"]
+                    ), config)
+
+                    return error_result
+
+        # Parse response
+        try:
+            response_data = response.json()
+        except ValueError:
+            response_data = {"text": response.text}
+
+        result = {
+            "success": True,
+            "status_code": response.status_code,
+            "data": response_data,
+            "execution_id": response.headers.get("x-n8n-execution-id"),
+            "webhook": config.name,
+            "attempts": attempt,
+            "duration": time.perf_counter() - started,
+            "timeouts": timer.timeout.as_dict() if timer else None
+        }
 
-            return error_result
+        # Log success
+        self._log_webhook(WebhookLog(
+            timestamp=datetime.utcnow().isoformat(),
+            webhook_name=config.name,
+            direction="outgoing",
+            status="success",
+            payload=payload,
+            response=result,
+            duration=result["duration"],
+            timeouts=result["timeouts"]
+        ), config)
+
+        if cache_key:
+            self._cache_put(cache_key, config.cache_ttl, result)
+        return result
 
     def get_logs(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get recent webhook logs"""
@@ -209,7 +380,7 @@ class WebhookManager:
                 "url": config.url,
                 "method": config.method
             }
-            for name, config in self.webhooks.items()
+            for name, config in self._current_registry().webhooks.items()
         ]
 
 
@@ -259,7 +430,7 @@ async def trigger_content_generation(
         "timestamp": datetime.utcnow().isoformat()
     }
 
-    result = await webhook_manager.send_webhook("n8n_content_gen", payload)
+    result = await webhook_manager.send_webhook("content_generation", payload)
 
     if result.get("success"):
         return f"""✅ Content generation workflow started!
@@ -314,7 +485,7 @@ async def schedule_social_media_post(
         "timestamp": datetime.utcnow().isoformat()
     }
 
-    result = await webhook_manager.send_webhook("n8n_social_post", payload)
+    result = await webhook_manager.send_webhook("social_media_scheduler", payload)
 
     if result.get("success"):
         time_str = schedule_time if schedule_time and schedule_time != "now" else "immediately"
@@ -364,7 +535,7 @@ async def fetch_analytics_report(
         "timestamp": datetime.utcnow().isoformat()
     }
 
-    result = await webhook_manager.send_webhook("n8n_analytics", payload)
+    result = await webhook_manager.send_webhook("analytics_processor", payload)
 
     if result.get("success"):
         data = result.get("data", {})
@@ -413,7 +584,7 @@ async def process_media_file(
         "timestamp": datetime.utcnow().isoformat()
     }
 
-    result = await webhook_manager.send_webhook("n8n_media_process", payload)
+    result = await webhook_manager.send_webhook("media_processor", payload)
 
     if result.get("success"):
         return f"""✅ Media processing started!
@@ -471,7 +642,7 @@ async def trigger_campaign_workflow(
         "timestamp": datetime.utcnow().isoformat()
     }
 
-    result = await webhook_manager.send_webhook("n8n_campaign", payload)
+    result = await webhook_manager.send_webhook("campaign", payload)
 
     if result.get("success"):
         return f"""🚀 Campaign workflow initiated!
@@ -586,6 +757,9 @@ async def get_webhook_logs(limit: int = 10, __user__: dict = {}) -> str:
             f"{status_emoji} {direction_emoji} {log['webhook_name']}\n"
             f"  Time: {log['timestamp']}\n"
             f"  Status: {log['status']}"
+            + (f" ({log['duration']:.2f}s)" if log.get('duration') is not None else "")
+            + (f"\n  Timeouts: connect {log['timeouts']['connect']:.1f}s, read {log['timeouts']['read']:.1f}s"
+               if log.get('timeouts') else "")
         )
 
     return f"""📊 Recent Webhook Activity (Last {len(logs)})
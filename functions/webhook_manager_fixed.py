@@ -176,7 +176,7 @@ class Tools:
             "timestamp": datetime.utcnow().isoformat()
         }
 
-        result = await self.filter.send_webhook("/webhook/content-generation", payload)
+        result = await self.filter.send_webhook("/webhook/content-gen", payload)
 
         if result.get("success"):
             return f"""✅ Content generation workflow started!
@@ -231,7 +231,7 @@ Please check that n8n is running and the webhook is configured."""
             "timestamp": datetime.utcnow().isoformat()
         }
 
-        result = await self.filter.send_webhook("/webhook/social-post", payload)
+        result = await self.filter.send_webhook("/webhook/social-scheduler", payload)
 
         if result.get("success"):
             time_str = schedule_time if schedule_time != "now" else "immediately"
@@ -278,7 +278,7 @@ Error: {result.get('error')}"""
             "timestamp": datetime.utcnow().isoformat()
         }
 
-        result = await self.filter.send_webhook("/webhook/analytics", payload, method="GET")
+        result = await self.filter.send_webhook("/webhook/analytics", payload)
 
         if result.get("success"):
             data = result.get("data", {})
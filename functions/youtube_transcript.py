@@ -7,11 +7,68 @@ required_open_webui_version: 0.3.9
 """
 
 import re
+import os
+import gzip
 import json
-from typing import Optional, Dict, Any, List
+import hashlib
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
 from pydantic import BaseModel, Field
 
 
+class TranscriptIndex:
+    """
+    Writer side of the SQLite FTS5 transcript index searched by
+    Tools/youtube_transcript_fixed.py. Keep SCHEMA in sync with that file.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS videos (
+            video_id TEXT PRIMARY KEY,
+            url TEXT,
+            title TEXT,
+            author TEXT,
+            indexed_at REAL
+        );
+        CREATE VIRTUAL TABLE IF NOT EXISTS segments USING fts5(
+            text, video_id UNINDEXED, start_seconds UNINDEXED
+        );
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._ready:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self.SCHEMA)
+            self._ready = True
+        return conn
+
+    def add(self, video_id: str, url: str, title: str, author: str,
+            segments: List[Tuple[float, str]]):
+        """Replace the indexed segments of one video"""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM segments WHERE video_id = ?", (video_id,))
+            conn.executemany(
+                "INSERT INTO segments (text, video_id, start_seconds) VALUES (?, ?, ?)",
+                [(text, video_id, int(start)) for start, text in segments if text],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO videos VALUES (?, ?, ?, ?, ?)",
+                (video_id, url, title, author, time.time()),
+            )
+
+
 class Filter:
     class Valves(BaseModel):
         priority: int = Field(
@@ -25,9 +82,48 @@ class Filter:
             default="",
             description="Proxy URL (e.g., http://proxy:port or socks5://proxy:port)"
         )
+        index_transcripts: bool = Field(
+            default=True,
+            description="Add extracted transcripts to the local search index"
+        )
+        index_path: str = Field(
+            default="data/transcripts/index.db",
+            description="SQLite file holding the transcript search index"
+        )
+        transcript_mode: str = Field(
+            default="inline",
+            description="'inline' appends transcript text to the message; 'handle' stores it once and inserts a reference handle"
+        )
+        blob_dir: str = Field(
+            default="data/transcripts/blobs",
+            description="Directory of the content-addressed transcript store used by 'handle' mode"
+        )
+        index_chunk_seconds: int = Field(
+            default=30,
+            description="Length of each timestamped transcript segment in the index"
+        )
 
     def __init__(self):
         self.valves = self.Valves()
+        self._ydl_local = threading.local()
+        self._index: Optional[TranscriptIndex] = None
+
+    def _get_index(self) -> "TranscriptIndex":
+        if self._index is None or self._index.path != self.valves.index_path:
+            self._index = TranscriptIndex(self.valves.index_path)
+        return self._index
+
+    def _chunk_segments(self, segments: List[Tuple[float, str]]) -> List[Tuple[float, str]]:
+        """Merge caption lines into fixed-length chunks so phrases spanning lines still match"""
+        chunk_seconds = max(1, self.valves.index_chunk_seconds)
+        chunks: List[Tuple[float, str]] = []
+        for start, text in segments:
+            bucket = int(start // chunk_seconds) * chunk_seconds
+            if chunks and chunks[-1][0] == bucket:
+                chunks[-1] = (bucket, f"{chunks[-1][1]} {text}")
+            else:
+                chunks.append((bucket, text))
+        return chunks
 
     def extract_video_id(self, url: str) -> Optional[str]:
         """Extract YouTube video ID from URL"""
@@ -43,79 +139,132 @@ class Filter:
                 return match.group(1)
         return None
 
+    def _get_ydl(self):
+        """
+        Return the YoutubeDL instance for the current worker thread.
+
+        Building a YoutubeDL loads every extractor and parses the options, so
+        one instance is kept per thread and only rebuilt when the proxy changes.
+        """
+        import yt_dlp
+
+        proxy = self.valves.proxy_url if self.valves.use_proxy else ""
+        cached = getattr(self._ydl_local, "ydl", None)
+        if cached is not None and self._ydl_local.proxy == proxy:
+            return cached
+
+        ydl_opts = {
+            'skip_download': True,
+            'noplaylist': True,
+            'quiet': True,
+            'no_warnings': True,
+            # Subtitle tracks come from the player response, so the DASH/HLS
+            # manifests (one extra request each) are never needed here.
+            'extractor_args': {'youtube': {'skip': ['dash', 'hls']}},
+        }
+
+        # Add proxy if enabled
+        if proxy:
+            ydl_opts['proxy'] = proxy
+
+        if cached is not None:
+            cached.close()
+        self._ydl_local.ydl = yt_dlp.YoutubeDL(ydl_opts)
+        self._ydl_local.proxy = proxy
+        return self._ydl_local.ydl
+
+    def get_subtitle_metadata(self, video_url: str) -> Dict[str, Any]:
+        """
+        Fetch only what the transcript path needs: subtitle track listings
+        plus title, channel and duration.
+
+        Uses process=False so yt-dlp skips format sorting/selection and
+        subtitle post-processing of the full info dict.
+        """
+        info = self._get_ydl().extract_info(video_url, download=False, process=False)
+
+        return {
+            'title': info.get('title', 'Unknown'),
+            'channel': info.get('uploader') or info.get('channel', 'Unknown'),
+            'duration': info.get('duration', 0),
+            'subtitles': info.get('subtitles') or {},
+            'automatic_captions': info.get('automatic_captions') or {},
+        }
+
+    def _parse_subtitles(self, subtitle_data: str, ext: str) -> List[Tuple[float, str]]:
+        """Parse a subtitle file into (start_seconds, text) segments"""
+        # Parse JSON subtitle format
+        if 'json' in ext:
+            sub_json = json.loads(subtitle_data)
+            segments = []
+            for event in sub_json.get('events', []):
+                text = ' '.join([
+                    seg.get('utf8', '')
+                    for seg in event.get('segs', [])
+                    if seg.get('utf8')
+                ])
+                if text:
+                    segments.append((event.get('tStartMs', 0) / 1000, text))
+            return segments
+
+        # For other formats (VTT/SRT), keep the text lines and take each
+        # line's start time from the preceding timestamp line
+        segments = []
+        start = 0.0
+        for line in subtitle_data.split('\n'):
+            if '-->' in line:
+                match = re.match(r'\s*(?:(\d+):)?(\d+):(\d+)[.,](\d+)', line)
+                if match:
+                    h, m, sec, frac = match.groups()
+                    start = int(h or 0) * 3600 + int(m) * 60 + int(sec) + int(frac) / 10 ** len(frac)
+            elif line and not line.isdigit():
+                segments.append((start, line))
+        return segments
+
     def get_transcript_ytdlp(self, video_url: str) -> Dict[str, Any]:
         """
         Get transcript using yt-dlp (works better with cloud IPs)
         """
         try:
-            import yt_dlp
-
-            ydl_opts = {
-                'writesubtitles': True,
-                'writeautomaticsub': True,
-                'subtitleslangs': ['en', 'en-US', 'en-GB'],
-                'skip_download': True,
-                'quiet': True,
-                'no_warnings': True,
-            }
+            info = self.get_subtitle_metadata(video_url)
+
+            # Get automatic or manual subtitles
+            subtitles = info['subtitles'] or info['automatic_captions']
+
+            # Try to get English subtitles
+            for lang in ['en', 'en-US', 'en-GB']:
+                if lang in subtitles:
+                    # Prefer json3, otherwise the first listed format
+                    track = next(
+                        (t for t in subtitles[lang] if t.get('ext') == 'json3'),
+                        subtitles[lang][0]
+                    )
 
-            # Add proxy if enabled
-            if self.valves.use_proxy and self.valves.proxy_url:
-                ydl_opts['proxy'] = self.valves.proxy_url
-
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(video_url, download=False)
-
-                # Get automatic or manual subtitles
-                subtitles = info.get('subtitles', {}) or info.get('automatic_captions', {})
-
-                # Try to get English subtitles
-                transcript_text = ""
-                for lang in ['en', 'en-US', 'en-GB']:
-                    if lang in subtitles:
-                        # Get the first subtitle format (usually JSON or SRT)
-                        sub_url = subtitles[lang][0]['url']
-
-                        # Download and parse subtitles
-                        import urllib.request
-                        with urllib.request.urlopen(sub_url) as response:
-                            subtitle_data = response.read().decode('utf-8')
-
-                            # Parse JSON subtitle format
-                            if 'json' in subtitles[lang][0].get('ext', ''):
-                                sub_json = json.loads(subtitle_data)
-                                events = sub_json.get('events', [])
-                                transcript_text = ' '.join([
-                                    seg.get('utf8', '')
-                                    for event in events
-                                    for seg in event.get('segs', [])
-                                    if seg.get('utf8')
-                                ])
-                            else:
-                                # For other formats, just use the raw text
-                                # Remove timestamps and formatting
-                                lines = subtitle_data.split('\n')
-                                transcript_text = ' '.join([
-                                    line for line in lines
-                                    if line and not line.isdigit() and '-->' not in line
-                                ])
-
-                        if transcript_text.strip():
-                            return {
-                                'success': True,
-                                'transcript': transcript_text.strip(),
-                                'method': 'yt-dlp',
-                                'language': lang,
-                                'title': info.get('title', 'Unknown'),
-                                'duration': info.get('duration', 0),
-                                'channel': info.get('uploader', 'Unknown')
-                            }
+                    # Download and parse subtitles
+                    import urllib.request
+                    with urllib.request.urlopen(track['url']) as response:
+                        subtitle_data = response.read().decode('utf-8')
+
+                    segments = self._parse_subtitles(subtitle_data, track.get('ext', ''))
+                    transcript_text = ' '.join(text for _, text in segments)
+
+                    if transcript_text.strip():
+                        return {
+                            'success': True,
+                            'transcript': transcript_text.strip(),
+                            'segments': segments,
+                            'method': 'yt-dlp',
+                            'language': lang,
+                            'title': info['title'],
+                            'duration': info['duration'],
+                            'channel': info['channel']
+                        }
 
-                return {
-                    'success': False,
-                    'error': 'No English subtitles found for this video',
-                    'available_languages': list(subtitles.keys())
-                }
+            return {
+                'success': False,
+                'error': 'No English subtitles found for this video',
+                'available_languages': list(subtitles.keys())
+            }
 
         except Exception as e:
             return {
@@ -147,6 +296,7 @@ class Filter:
                 return {
                     'success': True,
                     'transcript': full_text,
+                    'segments': [(entry['start'], entry['text']) for entry in transcript_data],
                     'method': 'youtube-transcript-api',
                     'language': transcript.language_code
                 }
@@ -161,6 +311,7 @@ class Filter:
                     return {
                         'success': True,
                         'transcript': full_text,
+                        'segments': [(entry['start'], entry['text']) for entry in transcript_data],
                         'method': 'youtube-transcript-api (auto-generated)',
                         'language': transcript.language_code
                     }
@@ -181,6 +332,44 @@ class Filter:
                 'error': f'API error: {str(e)}'
             }
 
+    def _store_blob(self, text: str) -> str:
+        """
+        Store text once in the content-addressed blob store and return its key.
+        Identical transcripts map to the same file, so repeats cost nothing.
+        """
+        data = text.encode('utf-8')
+        key = hashlib.sha256(data).hexdigest()[:24]
+        path = Path(self.valves.blob_dir) / key[:2] / f"{key}.txt.gz"
+
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{key}.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'wb') as raw, gzip.open(raw, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        return key
+
+    def _transcript_handle_info(self, result: Dict[str, Any]) -> str:
+        """Build the compact handle + summary that replaces the inline transcript"""
+        transcript = result['transcript']
+        handle = f"yt-transcript:{self._store_blob(transcript)}"
+        minutes, seconds = divmod(int(result.get('duration') or 0), 60)
+
+        return (
+            f"\n\n📺 **YouTube Transcript Stored**\n"
+            f"**Title:** {result.get('title', 'N/A')}\n"
+            f"**Channel:** {result.get('channel', 'N/A')}\n"
+            f"**Duration:** {minutes}:{seconds:02d}\n"
+            f"**Length:** {len(transcript.split())} words\n"
+            f"**Handle:** `{handle}`\n\n"
+            f"**Preview:** {transcript[:200]}...\n\n"
+            f"*Call resolve_transcript_handle with this handle to read the full transcript*"
+        )
+
     async def inlet(self, body: dict, __user__: Optional[dict] = None) -> dict:
         """Process incoming messages to detect YouTube URLs"""
         messages = body.get("messages", [])
@@ -203,15 +392,35 @@ class Filter:
 
                 # Add transcript info to the message
                 if result.get('success'):
-                    transcript_info = (
-                        f"\n\n📺 **YouTube Transcript Extracted**\n"
-                        f"**Title:** {result.get('title', 'N/A')}\n"
-                        f"**Channel:** {result.get('channel', 'N/A')}\n"
-                        f"**Method:** {result.get('method')}\n"
-                        f"**Language:** {result.get('language')}\n\n"
-                        f"**Transcript:**\n{result['transcript'][:500]}...\n\n"
-                        f"*Full transcript available for analysis*"
-                    )
+                    if self.valves.index_transcripts and result.get('segments'):
+                        try:
+                            self._get_index().add(
+                                video_id,
+                                video_url,
+                                result.get('title', ''),
+                                result.get('channel', ''),
+                                self._chunk_segments(result['segments']),
+                            )
+                        except Exception as e:
+                            print(f"Transcript indexing failed: {e}")
+
+                    transcript_info = None
+                    if self.valves.transcript_mode == "handle":
+                        try:
+                            transcript_info = self._transcript_handle_info(result)
+                        except Exception as e:
+                            # Blob store unusable: fall back to the inline summary
+                            print(f"Transcript blob store failed: {e}")
+                    if transcript_info is None:
+                        transcript_info = (
+                            f"\n\n📺 **YouTube Transcript Extracted**\n"
+                            f"**Title:** {result.get('title', 'N/A')}\n"
+                            f"**Channel:** {result.get('channel', 'N/A')}\n"
+                            f"**Method:** {result.get('method')}\n"
+                            f"**Language:** {result.get('language')}\n\n"
+                            f"**Transcript:**\n{result['transcript'][:500]}...\n\n"
+                            f"*Full transcript available for analysis*"
+                        )
 
                     # Append to user message
                     messages[-1]["content"] = user_message + transcript_info
@@ -0,0 +1,36 @@
+"""
+Multi-Agent Workspace runtime
+Shared building blocks for the lite CLI and workflow orchestration
+"""
+
+import importlib
+
+# Exports are imported on first access so that `import multi_agent.cache`
+# does not pull in the orchestrator's dependencies (httpx, yaml, pydantic)
+_EXPORTS = {
+    "ResponseCache": ".cache",
+    "PersonaCatalog": ".catalog",
+    "get_catalog": ".catalog",
+    "compile_catalog": ".catalog",
+    "Settings": ".config",
+    "load_config": ".config",
+    "LLMRouter": ".llm",
+    "LLMError": ".llm",
+    "Completion": ".llm",
+    "MetricsRecorder": ".metrics",
+    "get_recorder": ".metrics",
+    "AdaptiveTimeouts": ".timeouts",
+    "get_timeouts": ".timeouts",
+    "WorkflowEngine": ".orchestrator",
+    "WorkflowDefinition": ".orchestrator",
+    "WorkflowResult": ".orchestrator",
+    "load_workflows": ".orchestrator",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
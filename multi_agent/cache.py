@@ -0,0 +1,126 @@
+"""
+Persona Response Cache
+LRU + TTL cache for persona replies, with coalescing of identical in-flight requests
+"""
+
+import json
+import time
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+class ResponseCache:
+    """
+    Caches replies keyed by a hash of (model, system prompt, history, message,
+    temperature).
+
+    Only requests at or below `max_temperature` are cached; the default
+    covers the shipped personas (0.6-0.8), lower it to let creative personas
+    keep varying their answers. Concurrent async callers asking for
+    the same key share one upstream request instead of sending duplicates.
+
+    Callers build messages as [system prompt, history..., new message], so the
+    static system prompt is always the leading prefix of every request; this
+    keeps provider-side prompt caching effective for the requests that miss here.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 3600.0, max_temperature: float = 0.8):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_temperature = max_temperature
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, reply)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def make_key(
+        model: str,
+        system_prompt: str,
+        history: List[Dict[str, str]],
+        message: str,
+        temperature: float,
+    ) -> str:
+        """Stable hash of everything that determines the reply"""
+        material = json.dumps(
+            [model, system_prompt, history, message, round(float(temperature), 3)],
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def cacheable(self, temperature: float) -> bool:
+        return self.max_entries > 0 and temperature <= self.max_temperature
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a fresh cached reply, counting the hit or miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, reply: str):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, reply)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def get_or_create(self, key: str, create: Callable[[], Awaitable[str]]) -> str:
+        """
+        Return the cached reply, join an identical in-flight request, or run
+        `create` and cache its result. Failures are not cached.
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            with self._lock:
+                self.coalesced += 1
+                # Counted as a miss by get(); it is served without a request
+                self.misses -= 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            reply = await create()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so a failure nobody else awaited is not logged
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        self.put(key, reply)
+        future.set_result(reply)
+        return reply
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and hit rate (hits and coalesced requests count as hits)"""
+        served = self.hits + self.coalesced
+        total = served + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "hit_rate": served / total if total else 0.0,
+        }
@@ -0,0 +1,305 @@
+"""
+Persona Catalog
+Compiles the personas in config.yaml into one indexed file for fast loading
+"""
+
+import os
+import sys
+import json
+import mmap
+import time
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+CONFIG_FILE = ROOT_DIR / "config.yaml"
+PERSONAS_DIR = ROOT_DIR / "data" / "personas"  # custom <role>.json personas
+CATALOG_FILE = Path(os.getenv("PERSONA_CATALOG", ROOT_DIR / "data" / "personas.catalog"))
+
+CATALOG_VERSION = 1
+
+# Fields every catalog entry carries (besides the lazily read system_prompt)
+DEFAULTS = {"avatar": "🤖", "description": "", "model": "gpt-4", "temperature": 0.7, "capabilities": []}
+
+
+def source_stamps(config_path: Path = CONFIG_FILE, personas_dir: Path = PERSONAS_DIR) -> Dict[str, List[int]]:
+    """
+    [mtime_ns, size] of config.yaml and of every custom persona file, keyed
+    by file name; a source that changed, appeared or went away changes it.
+    """
+    stamps = {}
+    for path in [Path(config_path), *sorted(Path(personas_dir).glob("*.json"))]:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        stamps[path.name] = [stat.st_mtime_ns, stat.st_size]
+    return stamps
+
+
+def collect_personas(config_path: Path = CONFIG_FILE, personas_dir: Path = PERSONAS_DIR,
+                     reuse: Optional[Dict[str, List[Mapping]]] = None) -> List[Dict[str, Any]]:
+    """
+    Persona definitions from config.yaml `personas.default_personas`, plus
+    custom data/personas/<role>.json files for roles the config lacks.
+    Each records its `source` file name. `reuse` maps the names of sources
+    that did not change to their personas in the previous catalog; those
+    files are not parsed again (nor is the config loader imported).
+    """
+    reuse = reuse or {}
+    config_name = Path(config_path).name
+    if config_name in reuse:
+        defaults = reuse[config_name]
+    else:
+        from .config import load_config
+
+        defaults = load_config(config_path).personas.default_personas
+
+    personas = {}
+    for persona in defaults:
+        personas[persona["role"]] = {**persona, "source": config_name}
+    for path in sorted(Path(personas_dir).glob("*.json")):
+        if path.stem in personas:
+            continue
+        if reuse.get(path.name):
+            persona = dict(reuse[path.name][0])
+        else:
+            with open(path) as f:
+                persona = json.load(f)
+        persona.setdefault("role", path.stem)
+        personas[persona["role"]] = {**persona, "source": path.name}
+
+    return [{**DEFAULTS, **persona, "system_prompt": persona.get("system_prompt", "").rstrip("\n")}
+            for persona in personas.values()]
+
+
+def build_catalog(config_path: Path = CONFIG_FILE, personas_dir: Path = PERSONAS_DIR,
+                  previous: Optional["PersonaCatalog"] = None) -> bytes:
+    """
+    Catalog file contents: one JSON header line indexing the personas by
+    role (with the byte span of each system prompt) and stamping the
+    source files, then the prompts as one UTF-8 blob. Loaders parse only
+    the header; a prompt is decoded when it is first used. Personas from
+    sources unchanged since the `previous` catalog are copied from it.
+    """
+    # Stamp before reading, so an edit made meanwhile leaves the catalog stale
+    sources = source_stamps(config_path, personas_dir)
+    reuse = previous.unchanged(sources) if previous is not None else None
+    header = {"version": CATALOG_VERSION, "sources": sources, "personas": {}, "names": {}}
+    prompts = bytearray()
+    for persona in collect_personas(config_path, personas_dir, reuse):
+        prompt = persona.pop("system_prompt").encode()
+        persona["prompt"] = [len(prompts), len(prompt)]
+        prompts += prompt
+        header["personas"][persona["role"]] = persona
+        header["names"][persona["name"]] = persona["role"]
+    return json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode() + b"\n" + bytes(prompts)
+
+
+def compile_catalog(config_path: Path = CONFIG_FILE, personas_dir: Path = PERSONAS_DIR,
+                    output: Path = CATALOG_FILE, previous: Optional["PersonaCatalog"] = None) -> Path:
+    """Write the catalog atomically (temp file + rename) and return its path"""
+    output = Path(output)
+    data = build_catalog(config_path, personas_dir, previous)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output.with_name(f".{output.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, output)
+    return output
+
+
+class CatalogPersona(Mapping):
+    """
+    One catalog entry. Behaves like the persona dict; `system_prompt` is
+    decoded from the catalog's prompt blob on first access.
+    """
+
+    def __init__(self, fields: Dict[str, Any], blob: mmap.mmap, offset: int):
+        self._fields = fields
+        self._blob = blob
+        self._offset = offset
+        self._prompt: Optional[str] = None
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "system_prompt":
+            if self._prompt is None:
+                start, length = self._fields["prompt"]
+                start += self._offset
+                self._prompt = self._blob[start:start + length].decode()
+            return self._prompt
+        if key == "prompt":
+            raise KeyError(key)
+        return self._fields[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from (key for key in self._fields if key != "prompt")
+        yield "system_prompt"
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __repr__(self) -> str:
+        return f"CatalogPersona({self._fields['role']})"
+
+
+class PersonaCatalog(Mapping):
+    """
+    Role -> persona index backed by the compiled catalog, shared by the lite
+    CLI and the workflow engine. A read-only mapping of role to persona,
+    plus by_name() and refresh().
+
+    Loading maps one file and parses its header. refresh() stats the
+    catalog and the source files (throttled to once per `min_interval`
+    seconds) and compares them with the stamps in the header. When a
+    source was edited, added or removed the catalog is recompiled, parsing
+    only the changed files; the config loader (yaml, pydantic) is imported
+    only when config.yaml itself changed.
+    """
+
+    def __init__(self, path: Path = CATALOG_FILE, config_path: Path = CONFIG_FILE,
+                 personas_dir: Path = PERSONAS_DIR, min_interval: float = 1.0):
+        self.path = Path(path)
+        self.config_path = Path(config_path)
+        self.personas_dir = Path(personas_dir)
+        self.min_interval = min_interval
+        self._personas: Dict[str, CatalogPersona] = {}
+        self._names: Dict[str, str] = {}
+        self._sources: Optional[Dict[str, List[int]]] = None
+        self._loaded_mtime_ns: Optional[int] = None
+        self._last_scan = 0.0
+        self._lock = threading.Lock()
+        self.refresh(force=True)
+
+    def _stale(self) -> bool:
+        """True if no catalog is loaded or a source differs from its stamp in the header"""
+        return self._sources is None or source_stamps(self.config_path, self.personas_dir) != self._sources
+
+    def unchanged(self, sources: Dict[str, List[int]]) -> Dict[str, List[Mapping]]:
+        """Source file name -> its personas, for the sources whose stamp still matches"""
+        reuse = {name: [] for name, stamp in sources.items()
+                 if self._sources and self._sources.get(name) == stamp}
+        for persona in self._personas.values():
+            if persona.get("source") in reuse:
+                reuse[persona["source"]].append(persona)
+        return reuse
+
+    def _mtime_ns(self) -> Optional[int]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _load(self):
+        with open(self.path, "rb") as f:
+            blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        end = blob.find(b"\n")
+        header = json.loads(blob[:end])
+        if header.get("version") != CATALOG_VERSION:
+            raise ValueError(f"unsupported catalog version {header.get('version')}")
+        self._personas = {role: CatalogPersona(fields, blob, end + 1)
+                          for role, fields in header["personas"].items()}
+        self._names = header["names"]
+        self._sources = header.get("sources")  # None in catalogs from before source stamps
+
+    def refresh(self, force: bool = False) -> bool:
+        """Recompile if the sources changed and reload if the catalog did. Returns True if it changed."""
+        now = time.monotonic()
+        if not force and now - self._last_scan < self.min_interval:
+            return False
+
+        with self._lock:
+            self._last_scan = now
+            # Another process (setup.py, a second CLI) may have rewritten the catalog
+            changed = self._reload()
+            if self._stale() and self.config_path.exists():
+                try:
+                    compile_catalog(self.config_path, self.personas_dir, self.path, previous=self)
+                except (ImportError, OSError, ValueError, KeyError) as e:
+                    # Keep serving the existing catalog, if there is one
+                    print(f"⚠️  Could not compile persona catalog: {e}", file=sys.stderr)
+                else:
+                    changed = self._reload() or changed
+            return changed
+
+    def _reload(self) -> bool:
+        """Load the catalog file if it changed since it was last loaded"""
+        mtime_ns = self._mtime_ns()
+        if mtime_ns is None or mtime_ns == self._loaded_mtime_ns:
+            return False
+        try:
+            self._load()
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️  Could not load persona catalog {self.path}: {e}", file=sys.stderr)
+            return False
+        self._loaded_mtime_ns = mtime_ns
+        return True
+
+    def by_name(self, name: str) -> Optional[CatalogPersona]:
+        """Find a persona by display name (e.g. 'Content Strategist')"""
+        role = self._names.get(name)
+        return self._personas.get(role) if role else None
+
+    def __getitem__(self, role: str) -> CatalogPersona:
+        return self._personas[role]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._personas)
+
+    def __len__(self) -> int:
+        return len(self._personas)
+
+
+_catalogs: Dict[Path, PersonaCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(path: Path = CATALOG_FILE, config_path: Path = CONFIG_FILE) -> PersonaCatalog:
+    """Return the process-wide catalog for a catalog file"""
+    path = Path(path).resolve()
+    with _catalogs_lock:
+        if path not in _catalogs:
+            _catalogs[path] = PersonaCatalog(path, config_path)
+        return _catalogs[path]
+
+
+def format_modelfiles(personas: List[Mapping]) -> str:
+    """Open WebUI model definitions to paste into Workspace -> Models"""
+    rule = "=" * 65
+    lines = [rule, "COPY THESE MODELFILES INTO OPEN WEBUI", rule, "",
+             "Go to: http://localhost:8080",
+             "Login → Workspace → Models → Create a model", "",
+             f"Create {len(personas)} separate models using these:", ""]
+    for i, persona in enumerate(personas, 1):
+        lines += [
+            rule, f"{i}. {persona['name'].upper()}", rule, "",
+            f"Name: {persona['name']}",
+            f"Icon: {persona['avatar']}",
+            f"Description: {persona['description']}", "",
+            "Modelfile:", "---",
+            f"FROM {persona['model']}", "",
+            f'SYSTEM """{persona["system_prompt"]}"""', "",
+            f"PARAMETER temperature {persona['temperature']}", "---", "",
+        ]
+    lines += [rule, f"DONE! You now have {len(personas)} specialized AI personas!", rule, ""]
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compile config.yaml personas into the persona catalog")
+    parser.add_argument("--config", type=Path, default=CONFIG_FILE)
+    parser.add_argument("--output", type=Path, default=CATALOG_FILE)
+    parser.add_argument("--modelfiles", action="store_true",
+                        help="Print Open WebUI modelfiles for the personas instead")
+    args = parser.parse_args()
+
+    path = compile_catalog(args.config, PERSONAS_DIR, args.output)
+    catalog = PersonaCatalog(path, args.config)
+    if args.modelfiles:
+        print(format_modelfiles(list(catalog.values())), end="")
+    else:
+        print(f"✓ Compiled {len(catalog)} personas into {path} ({path.stat().st_size} bytes)")
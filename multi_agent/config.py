@@ -0,0 +1,223 @@
+"""
+Typed Configuration
+Parses config.yaml once into a frozen, env-interpolated snapshot
+"""
+
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+CONFIG_FILE = ROOT_DIR / "config.yaml"
+
+# ${VAR} or ${VAR:-default}
+_PLACEHOLDER = re.compile(r"\$\{([A-Za-z_][A-Za-z0-9_]*)(?::-([^}]*))?\}")
+
+# Environment variables that take precedence over config.yaml values
+ENV_OVERRIDES = {
+    ("n8n", "base_url"): "N8N_BASE_URL",
+    ("n8n", "api_key"): "N8N_API_KEY",
+}
+
+_SIZE_UNITS = {"": 1, "B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+
+class FrozenModel(BaseModel):
+    """Immutable settings section; unknown keys are kept as extra fields"""
+    model_config = ConfigDict(frozen=True, extra="allow")
+
+
+class ServerSettings(FrozenModel):
+    host: str = "0.0.0.0"
+    port: int = 8080
+
+
+class DatabaseSettings(FrozenModel):
+    engine: str = "sqlite"
+    path: str = "./data/webui.db"
+
+
+class WebhookSettings(FrozenModel):
+    """One n8n.webhooks entry"""
+    name: str
+    endpoint: str
+    description: str = ""
+    display_name: Optional[str] = None
+    method: str = "POST"
+    timeout: float = 30.0
+    retries: int = 0
+    cache_ttl: float = 0.0
+
+
+class AdaptiveTimeoutSettings(FrozenModel):
+    """n8n.adaptive_timeouts: bounds derived from observed latency (multi_agent.timeouts)"""
+    enabled: bool = False
+    factor: float = 3.0
+    percentile: float = 99.0
+    min_samples: int = 20
+    window: int = 500
+    min_connect: float = 0.5
+    max_connect: float = 10.0
+    min_read: float = 1.0
+
+
+class N8NSettings(FrozenModel):
+    enabled: bool = False
+    base_url: str = "http://localhost:5678"
+    api_key: Optional[str] = None
+    webhooks: Tuple[WebhookSettings, ...] = ()
+    adaptive_timeouts: AdaptiveTimeoutSettings = Field(default_factory=AdaptiveTimeoutSettings)
+    _by_name: Dict[str, WebhookSettings] = PrivateAttr(default_factory=dict)
+
+    def model_post_init(self, __context: Any):
+        self._by_name.update((hook.name, hook) for hook in self.webhooks)
+
+    def webhook(self, name: str) -> Optional[WebhookSettings]:
+        return self._by_name.get(name)
+
+    def url(self, endpoint: str) -> str:
+        return f"{self.base_url.rstrip('/')}{endpoint}"
+
+
+class PersonaSettings(FrozenModel):
+    enabled: bool = True
+    storage_path: str = "./data/personas"
+    default_personas: Tuple[Dict[str, Any], ...] = ()
+
+
+class CacheSettings(FrozenModel):
+    """multi_agent.cache: persona reply cache (multi_agent.cache)"""
+    max_entries: int = 256
+    ttl: float = 3600.0
+    max_temperature: float = 0.8
+
+
+class MultiAgentSettings(FrozenModel):
+    enabled: bool = True
+    max_concurrent_agents: int = 5
+    collaboration_mode: str = "sequential"
+    cache: CacheSettings = Field(default_factory=CacheSettings)
+    workflows: Tuple[Dict[str, Any], ...] = ()
+
+
+class ProviderSettings(FrozenModel):
+    """One models.providers entry; provider-specific keys are extra fields"""
+    name: str
+    type: Optional[str] = None
+    api_key: Optional[str] = None
+    base_url: Optional[str] = None
+    models: Tuple[str, ...] = ()
+    max_concurrency: Optional[int] = None
+
+
+class ModelSettings(FrozenModel):
+    providers: Tuple[ProviderSettings, ...] = ()
+
+
+class StorageSettings(FrozenModel):
+    type: str = "local"
+    path: str = "./data/uploads"
+    max_file_size: str = "50MB"
+
+    @property
+    def max_file_size_bytes(self) -> int:
+        match = re.fullmatch(r"\s*([\d.]+)\s*([KMG]?B?)\s*", self.max_file_size.upper())
+        if not match:
+            raise ValueError(f"Invalid storage.max_file_size: {self.max_file_size!r}")
+        return int(float(match.group(1)) * _SIZE_UNITS[match.group(2)])
+
+
+class RAGSettings(FrozenModel):
+    enabled: bool = True
+    chunk_size: int = 1000
+    chunk_overlap: int = 200
+
+
+class FeatureSettings(FrozenModel):
+    rag: RAGSettings = Field(default_factory=RAGSettings)
+
+
+class Settings(FrozenModel):
+    """
+    A snapshot of config.yaml with ${VAR} placeholders resolved.
+
+    Frozen: hand it to components at construction and read attributes on
+    hot paths; load_config() returns a new snapshot when the file changes.
+    """
+    server: ServerSettings = Field(default_factory=ServerSettings)
+    database: DatabaseSettings = Field(default_factory=DatabaseSettings)
+    n8n: N8NSettings = Field(default_factory=N8NSettings)
+    personas: PersonaSettings = Field(default_factory=PersonaSettings)
+    multi_agent: MultiAgentSettings = Field(default_factory=MultiAgentSettings)
+    models: ModelSettings = Field(default_factory=ModelSettings)
+    storage: StorageSettings = Field(default_factory=StorageSettings)
+    features: FeatureSettings = Field(default_factory=FeatureSettings)
+    source: Optional[str] = None  # path the snapshot was parsed from
+
+
+def interpolate(value: Any, environ=os.environ) -> Any:
+    """
+    Resolve ${VAR} / ${VAR:-default} in every string of a parsed YAML tree.
+    A value that is only an unset placeholder becomes None, so optional
+    keys like api_key fall back to their defaults.
+    """
+    if isinstance(value, dict):
+        return {key: interpolate(item, environ) for key, item in value.items()}
+    if isinstance(value, list):
+        return [interpolate(item, environ) for item in value]
+    if not isinstance(value, str) or "${" not in value:
+        return value
+
+    match = _PLACEHOLDER.fullmatch(value)
+    if match and match.group(2) is None and match.group(1) not in environ:
+        return None
+    return _PLACEHOLDER.sub(lambda m: environ.get(m.group(1), m.group(2) or ""), value)
+
+
+def parse_config(data: Dict[str, Any], environ=os.environ, source: Optional[str] = None) -> Settings:
+    """Build a Settings snapshot from a parsed config.yaml mapping"""
+    data = interpolate(data or {}, environ)
+    for (section, key), variable in ENV_OVERRIDES.items():
+        if environ.get(variable):
+            data.setdefault(section, {})
+            data[section] = {**(data[section] or {}), key: environ[variable]}
+    return Settings(**data, source=source)
+
+
+_cache: Dict[Path, Tuple[int, int, Settings]] = {}
+_cache_lock = threading.Lock()
+
+
+def load_config(path: Path = CONFIG_FILE) -> Settings:
+    """
+    The Settings for a config file, parsed once per file version (mtime and
+    size). A missing file gives the defaults plus environment overrides.
+    """
+    path = Path(path).resolve()
+    try:
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        version = (0, -1)
+
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached and cached[:2] == version:
+            return cached[2]
+
+    if version[1] < 0:
+        data = {}
+    else:
+        import yaml
+
+        with open(path) as f:
+            data = yaml.safe_load(f) or {}
+    settings = parse_config(data, source=str(path))
+
+    with _cache_lock:
+        _cache[path] = (*version, settings)
+    return settings
@@ -0,0 +1,438 @@
+"""
+LLM Provider Layer
+Async, provider-agnostic chat completions routed by model name
+"""
+
+import os
+import abc
+import json
+import time
+import asyncio
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+from pydantic import BaseModel
+
+from .config import CONFIG_FILE, Settings, load_config
+
+# Default concurrency per provider type when config.yaml does not set one
+DEFAULT_CONCURRENCY = {"openai": 8, "anthropic": 4, "ollama": 2, "fake": 64}
+
+
+class LLMError(Exception):
+    """A provider request failed or no provider can serve the model"""
+
+
+class Completion(BaseModel):
+    """A finished (or interrupted) chat completion"""
+    text: str
+    model: str
+    provider: str
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    latency: float = 0.0
+    first_token_latency: Optional[float] = None
+    finished: bool = True
+
+
+class Provider(abc.ABC):
+    """
+    Base class for one configured provider.
+
+    Each provider owns a pooled httpx.AsyncClient (created on first use in
+    the running event loop) and a semaphore that bounds its in-flight
+    requests, so a slow local model cannot starve calls to other providers.
+    """
+
+    type = ""
+
+    def __init__(self, name: str, models: List[str], max_concurrency: int,
+                 base_url: str = "", api_key: Optional[str] = None, timeout: float = 120.0):
+        self.name = name
+        self.models = models
+        self.max_concurrency = max_concurrency
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.headers(),
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+            )
+        return self._client
+
+    def headers(self) -> Dict[str, str]:
+        return {}
+
+    def check(self):
+        """Raise LLMError if the provider is not usable (e.g. missing key)"""
+
+    async def complete(self, model: str, messages: List[Dict[str, str]],
+                       temperature: float = 0.7, **options) -> Completion:
+        """Non-streaming completion; implemented on top of stream()"""
+        stream = self.stream(model, messages, temperature, **options)
+        try:
+            async for _ in stream:
+                pass
+        finally:
+            await stream.aclose()
+        return stream.completion
+
+    def stream(self, model: str, messages: List[Dict[str, str]],
+               temperature: float = 0.7, **options) -> "CompletionStream":
+        self.check()
+        return CompletionStream(self, model, messages, temperature, options)
+
+    @abc.abstractmethod
+    def _events(self, model: str, messages: List[Dict[str, str]],
+                temperature: float, options: Dict[str, Any],
+                usage: Dict[str, int]) -> AsyncIterator[str]:
+        """Yield text deltas, filling `usage` with token counts when reported"""
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class OpenAICompatibleProvider(Provider):
+    """OpenAI, and any server speaking its chat completions API (Ollama's /v1)"""
+
+    type = "openai"
+
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+
+    def check(self):
+        if self.type == "openai" and not self.api_key:
+            raise LLMError(f"No API key configured for provider '{self.name}' (set OPENAI_API_KEY)")
+
+    async def _events(self, model, messages, temperature, options, usage):
+        body = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+            **options,
+        }
+        async with self.client.stream("POST", "/chat/completions", json=body) as response:
+            if response.status_code >= 400:
+                await response.aread()
+                raise LLMError(f"{self.name} returned {response.status_code}: {response.text[:300]}")
+
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    continue
+                chunk = json.loads(data)
+                if chunk.get("usage"):
+                    usage["prompt_tokens"] = chunk["usage"].get("prompt_tokens")
+                    usage["completion_tokens"] = chunk["usage"].get("completion_tokens")
+                for choice in chunk.get("choices") or []:
+                    delta = (choice.get("delta") or {}).get("content")
+                    if delta:
+                        yield delta
+
+
+class OllamaProvider(OpenAICompatibleProvider):
+    """Local Ollama server through its OpenAI-compatible endpoint"""
+
+    type = "ollama"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not self.base_url.endswith("/v1"):
+            self.base_url += "/v1"
+
+
+class AnthropicProvider(Provider):
+    """Anthropic Messages API"""
+
+    type = "anthropic"
+
+    def headers(self) -> Dict[str, str]:
+        return {"x-api-key": self.api_key or "", "anthropic-version": "2023-06-01"}
+
+    def check(self):
+        if not self.api_key:
+            raise LLMError(f"No API key configured for provider '{self.name}' (set ANTHROPIC_API_KEY)")
+
+    async def _events(self, model, messages, temperature, options, usage):
+        system = "\n\n".join(m["content"] for m in messages if m["role"] == "system")
+        body = {
+            "model": model,
+            "messages": [m for m in messages if m["role"] != "system"],
+            "temperature": temperature,
+            "max_tokens": options.pop("max_tokens", 1024),
+            "stream": True,
+            **options,
+        }
+        if system:
+            body["system"] = system
+
+        async with self.client.stream("POST", "/v1/messages", json=body) as response:
+            if response.status_code >= 400:
+                await response.aread()
+                raise LLMError(f"{self.name} returned {response.status_code}: {response.text[:300]}")
+
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                event = json.loads(line[5:].strip())
+                if event.get("type") == "message_start":
+                    usage["prompt_tokens"] = event["message"].get("usage", {}).get("input_tokens")
+                elif event.get("type") == "message_delta":
+                    usage["completion_tokens"] = event.get("usage", {}).get("output_tokens")
+                elif event.get("type") == "content_block_delta":
+                    text = event.get("delta", {}).get("text")
+                    if text:
+                        yield text
+
+
+class FakeProvider(Provider):
+    """
+    Offline stand-in that answers every model with a deterministic reply.
+    Used for load tests of the lite CLI and workflow engine without network
+    access; latency and token rate are configurable.
+    """
+
+    type = "fake"
+
+    def __init__(self, *args, latency: float = 0.05, tokens_per_second: float = 200.0,
+                 reply_tokens: int = 40, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.reply_tokens = reply_tokens
+
+    async def _events(self, model, messages, temperature, options, usage):
+        prompt = messages[-1]["content"] if messages else ""
+        words = f"[{model}] reply to: {prompt[:60]}".split()
+        words += ["lorem"] * max(0, self.reply_tokens - len(words))
+
+        usage["prompt_tokens"] = sum(len(m["content"]) // 4 + 1 for m in messages)
+        usage["completion_tokens"] = len(words)
+
+        await asyncio.sleep(self.latency)
+        delay = 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+        for i, word in enumerate(words):
+            if delay:
+                await asyncio.sleep(delay)
+            yield word if i == 0 else " " + word
+
+
+class CompletionStream:
+    """
+    Async iterator over the text deltas of one completion.
+
+    Holds a slot of the provider's semaphore while open. After iteration
+    ends (or aclose() is called early), `completion` holds the text
+    received, token usage and timings.
+    """
+
+    def __init__(self, provider: Provider, model: str, messages: List[Dict[str, str]],
+                 temperature: float, options: Dict[str, Any]):
+        self.provider = provider
+        self.model = model
+        self.messages = messages
+        self.temperature = temperature
+        self.options = options
+        self.completion: Optional[Completion] = None
+        self._usage: Dict[str, int] = {}
+        self._parts: List[str] = []
+        self._events: Optional[AsyncIterator[str]] = None
+        self._acquired = False
+        self._start = 0.0
+        self._first_token: Optional[float] = None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> str:
+        if self.completion is not None:
+            raise StopAsyncIteration
+        if self._events is None:
+            await self.provider.semaphore.acquire()
+            self._acquired = True
+            self._start = time.perf_counter()
+            self._events = self.provider._events(
+                self.model, self.messages, self.temperature, dict(self.options), self._usage
+            ).__aiter__()
+
+        try:
+            delta = await self._events.__anext__()
+        except StopAsyncIteration:
+            await self._finish(finished=True)
+            raise
+        except httpx.HTTPError as e:
+            await self._finish(finished=False)
+            raise LLMError(f"{self.provider.name} request failed: {e}") from e
+        except BaseException:
+            await self._finish(finished=False)
+            raise
+
+        if self._first_token is None:
+            self._first_token = time.perf_counter()
+        self._parts.append(delta)
+        return delta
+
+    async def _finish(self, finished: bool):
+        if self.completion is not None:
+            return
+        if self._events is not None:
+            try:
+                await self._events.aclose()
+            except Exception:
+                pass
+        if self._acquired:
+            self.provider.semaphore.release()
+            self._acquired = False
+
+        now = time.perf_counter()
+        self.completion = Completion(
+            text="".join(self._parts),
+            model=self.model,
+            provider=self.provider.name,
+            prompt_tokens=self._usage.get("prompt_tokens"),
+            completion_tokens=self._usage.get("completion_tokens"),
+            latency=now - self._start if self._start else 0.0,
+            first_token_latency=self._first_token - self._start if self._first_token else None,
+            finished=finished,
+        )
+
+    async def aclose(self):
+        """Stop early (e.g. on Ctrl+C) and release the provider slot"""
+        await self._finish(finished=False)
+
+
+PROVIDER_TYPES = {
+    "openai": OpenAICompatibleProvider,
+    "ollama": OllamaProvider,
+    "anthropic": AnthropicProvider,
+    "fake": FakeProvider,
+}
+
+
+class LLMRouter:
+    """
+    Routes each request to a provider by model name.
+
+    Models listed under a provider in config.yaml `models.providers` go to
+    that provider; other names fall back by prefix (gpt-/o1 -> openai,
+    claude -> anthropic) and then to the first provider. Setting
+    LLM_PROVIDER=fake sends everything to the offline fake provider.
+    """
+
+    def __init__(self, providers: List[Provider], force: Optional[str] = None):
+        if not providers:
+            raise LLMError("No LLM providers configured")
+        self.providers = {provider.name: provider for provider in providers}
+        self.force = force
+        self._routes: Dict[str, Provider] = {}
+        for provider in providers:
+            for model in provider.models:
+                self._routes.setdefault(model, provider)
+
+    @classmethod
+    def from_config(cls, config_path: Path = CONFIG_FILE) -> "LLMRouter":
+        return cls.from_settings(load_config(config_path))
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "LLMRouter":
+        """Build the router from a config snapshot's models.providers"""
+        providers = []
+        for provider in settings.models.providers:
+            entry = provider.model_dump(exclude_none=True)
+            provider_type = entry.get("type") or entry["name"]
+            if provider_type not in PROVIDER_TYPES:
+                continue
+            providers.append(_build_provider(entry, provider_type))
+
+        if not providers:
+            providers.append(_build_provider({"name": "openai"}, "openai"))
+
+        force = os.getenv("LLM_PROVIDER")
+        if force == "fake" and not any(p.type == "fake" for p in providers):
+            providers.append(FakeProvider(
+                "fake", [], DEFAULT_CONCURRENCY["fake"],
+                latency=float(os.getenv("LLM_FAKE_LATENCY", "0.05")),
+                tokens_per_second=float(os.getenv("LLM_FAKE_TOKENS_PER_SECOND", "200")),
+            ))
+        return cls(providers, force=force)
+
+    def route(self, model: str) -> Provider:
+        if self.force:
+            for provider in self.providers.values():
+                if self.force in (provider.name, provider.type):
+                    return provider
+            raise LLMError(f"LLM_PROVIDER={self.force} does not match a configured provider")
+
+        if model in self._routes:
+            return self._routes[model]
+
+        for prefixes, provider_type in ((("gpt-", "o1", "o3", "o4"), "openai"), (("claude",), "anthropic")):
+            if model.startswith(prefixes):
+                for provider in self.providers.values():
+                    if provider.type == provider_type:
+                        return provider
+        return next(iter(self.providers.values()))
+
+    async def complete(self, model: str, messages: List[Dict[str, str]],
+                       temperature: float = 0.7, **options) -> Completion:
+        return await self.route(model).complete(model, messages, temperature, **options)
+
+    def stream(self, model: str, messages: List[Dict[str, str]],
+               temperature: float = 0.7, **options) -> CompletionStream:
+        return self.route(model).stream(model, messages, temperature, **options)
+
+    async def aclose(self):
+        for provider in self.providers.values():
+            await provider.aclose()
+
+
+def _build_provider(entry: Dict[str, Any], provider_type: str) -> Provider:
+    """Create a provider from a config.yaml models.providers entry"""
+    name = entry.get("name", provider_type)
+    models = list(entry.get("models") or [])
+    concurrency = int(entry.get("max_concurrency", DEFAULT_CONCURRENCY[provider_type]))
+    api_key = entry.get("api_key")  # ${VAR} already resolved by the config loader
+
+    if provider_type == "openai":
+        api_key = api_key or os.getenv("OPENAI_API_KEY")
+        base_url = entry.get("base_url") or os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+    elif provider_type == "anthropic":
+        api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
+        base_url = entry.get("base_url") or "https://api.anthropic.com"
+    elif provider_type == "ollama":
+        base_url = os.getenv("OLLAMA_BASE_URL") or entry.get("base_url", "http://localhost:11434")
+    else:
+        base_url = ""
+
+    provider_cls = PROVIDER_TYPES[provider_type]
+    if provider_cls is FakeProvider:
+        return FakeProvider(
+            name, models, concurrency,
+            latency=float(entry.get("latency", 0.05)),
+            tokens_per_second=float(entry.get("tokens_per_second", 200)),
+        )
+    return provider_cls(name, models, concurrency, base_url=base_url, api_key=api_key)
@@ -0,0 +1,258 @@
+"""
+Usage Metrics
+Token and latency accounting per persona, workflow and webhook
+"""
+
+import os
+import json
+import time
+import asyncio
+import atexit
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+METRICS_FILE = Path(os.getenv("METRICS_FILE", ROOT_DIR / "data" / "metrics.json"))
+
+SECTIONS = ("personas", "workflows", "webhooks")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 chars/token) for providers that report no usage"""
+    return len(text) // 4 + 1 if text else 0
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class UsageStats:
+    """
+    Counters for one persona, workflow or webhook.
+
+    Totals cover every recorded call; latency percentiles are computed over
+    the most recent `window` calls so they follow current behaviour.
+    """
+
+    def __init__(self, window: int = 200):
+        self.calls = 0
+        self.errors = 0
+        self.cached = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.latency_total = 0.0
+        self.latencies = deque(maxlen=window)
+        self.models: Dict[str, int] = {}
+        self.last_used: Optional[float] = None
+
+    def add(self, latency: float, prompt_tokens: int = 0, completion_tokens: int = 0,
+            success: bool = True, cached: bool = False, model: Optional[str] = None):
+        self.calls += 1
+        self.errors += 0 if success else 1
+        self.cached += 1 if cached else 0
+        self.prompt_tokens += prompt_tokens or 0
+        self.completion_tokens += completion_tokens or 0
+        self.latency_total += latency
+        self.latencies.append(round(latency, 4))
+        if model:
+            self.models[model] = self.models.get(model, 0) + 1
+        self.last_used = time.time()
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def summary(self) -> Dict[str, Any]:
+        recent = list(self.latencies)
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "cached": self.cached,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+            "avg_tokens": self.total_tokens / self.calls if self.calls else 0.0,
+            "avg_latency": self.latency_total / self.calls if self.calls else 0.0,
+            "p50_latency": _percentile(recent, 50),
+            "p95_latency": _percentile(recent, 95),
+            "models": dict(self.models),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "cached": self.cached,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "latency_total": self.latency_total,
+            "latencies": list(self.latencies),
+            "models": self.models,
+            "last_used": self.last_used,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], window: int = 200) -> "UsageStats":
+        stats = cls(window)
+        for field in ("calls", "errors", "cached", "prompt_tokens", "completion_tokens",
+                      "latency_total", "last_used"):
+            setattr(stats, field, data.get(field, getattr(stats, field)))
+        stats.latencies.extend(data.get("latencies") or [])
+        stats.models = dict(data.get("models") or {})
+        return stats
+
+
+class MetricsRecorder:
+    """
+    Aggregates usage per persona role, workflow and webhook and persists it
+    to a JSON file, so statistics roll over across sessions.
+
+    Writes are throttled to one per `flush_interval` seconds (plus one at
+    exit) and are atomic (temp file + rename); a write triggered from a
+    running event loop happens in its default executor, so recording never
+    blocks the loop on disk I/O. Processes sharing a file each keep their
+    own view; the last one to flush wins.
+    """
+
+    def __init__(self, path: Path = METRICS_FILE, window: int = 200, flush_interval: float = 5.0):
+        self.path = Path(path)
+        self.window = window
+        self.flush_interval = flush_interval
+        self._stats: Dict[str, Dict[str, UsageStats]] = {section: {} for section in SECTIONS}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_flush = 0.0
+        self._generation = 0  # of the last snapshot taken for writing
+        self._written = 0  # generation currently on disk
+        self._write_lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        for section in SECTIONS:
+            for name, entry in (data.get(section) or {}).items():
+                self._stats[section][name] = UsageStats.from_dict(entry, self.window)
+
+    def _add(self, section: str, name: str, **values):
+        with self._lock:
+            stats = self._stats[section].get(name)
+            if stats is None:
+                stats = self._stats[section][name] = UsageStats(self.window)
+            stats.add(**values)
+            self._dirty = True
+
+        snapshot = self._snapshot(force=False)
+        if snapshot is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write(*snapshot)
+        else:
+            loop.run_in_executor(None, self._write, *snapshot).add_done_callback(self._write_done)
+
+    def record_persona(self, role: str, model: str, latency: float,
+                       prompt_tokens: int = 0, completion_tokens: int = 0,
+                       success: bool = True, cached: bool = False):
+        """One persona call (a cache hit counts as a call with no tokens)"""
+        self._add("personas", role, latency=latency, prompt_tokens=prompt_tokens,
+                  completion_tokens=completion_tokens, success=success, cached=cached, model=model)
+
+    def record_workflow(self, name: str, duration: float, prompt_tokens: int = 0,
+                        completion_tokens: int = 0, success: bool = True):
+        """One workflow run, with the tokens of all its steps"""
+        self._add("workflows", name, latency=duration, prompt_tokens=prompt_tokens,
+                  completion_tokens=completion_tokens, success=success)
+
+    def record_webhook(self, name: str, latency: float, success: bool = True):
+        """One outgoing webhook request"""
+        self._add("webhooks", name, latency=latency, success=success)
+
+    def summary(self, section: str) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: stats.summary() for name, stats in self._stats[section].items()}
+
+    def flush(self, force: bool = False):
+        """Write the statistics to disk if they changed (throttled unless forced)"""
+        snapshot = self._snapshot(force)
+        if snapshot is not None:
+            self._write(*snapshot)
+
+    def _snapshot(self, force: bool):
+        """(generation, data) to write, or None if nothing is due"""
+        now = time.monotonic()
+        with self._lock:
+            if not self._dirty or (not force and now - self._last_flush < self.flush_interval):
+                return None
+            data = {
+                section: {name: stats.to_dict() for name, stats in entries.items()}
+                for section, entries in self._stats.items()
+            }
+            self._dirty = False
+            self._last_flush = now
+            self._generation += 1
+            return self._generation, data
+
+    def _write(self, generation: int, data: Dict[str, Any]):
+        with self._write_lock:
+            if generation <= self._written:
+                return  # a newer snapshot is already on disk
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+            with open(tmp, "w") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+            self._written = generation
+
+    def _write_done(self, future: asyncio.Future):
+        if not future.cancelled() and future.exception() is not None:
+            print(f"Could not write metrics to {self.path}: {future.exception()}")
+
+    def reset(self):
+        with self._lock:
+            self._stats = {section: {} for section in SECTIONS}
+            self._dirty = True
+        self.flush(force=True)
+
+    def format_report(self, sort_by: str = "total_tokens") -> str:
+        """Plain-text tables of all sections, most expensive first"""
+        titles = {"personas": "Personas", "workflows": "Workflows", "webhooks": "Webhooks"}
+        lines = []
+        for section in SECTIONS:
+            rows = sorted(self.summary(section).items(), key=lambda item: -item[1][sort_by])
+            if not rows:
+                continue
+            lines.append(f"{titles[section]}:")
+            lines.append(f"  {'name':<28} {'calls':>6} {'err':>4} {'cached':>6} "
+                         f"{'tokens':>9} {'avg tok':>8} {'avg s':>7} {'p95 s':>7}")
+            for name, s in rows:
+                lines.append(
+                    f"  {name[:28]:<28} {s['calls']:>6} {s['errors']:>4} {s['cached']:>6} "
+                    f"{s['total_tokens']:>9} {s['avg_tokens']:>8.0f} "
+                    f"{s['avg_latency']:>7.2f} {s['p95_latency']:>7.2f}"
+                )
+            lines.append("")
+        return "\n".join(lines).rstrip() or "No usage recorded yet."
+
+
+_recorders: Dict[Path, MetricsRecorder] = {}
+_recorders_lock = threading.Lock()
+
+
+def get_recorder(path: Path = METRICS_FILE) -> MetricsRecorder:
+    """Return the process-wide recorder for a metrics file, flushed at exit"""
+    path = Path(path).resolve()
+    with _recorders_lock:
+        if path not in _recorders:
+            recorder = _recorders[path] = MetricsRecorder(path)
+            atexit.register(recorder.flush, force=True)
+        return _recorders[path]
@@ -0,0 +1,447 @@
+"""
+Workflow Orchestration Engine
+Executes the multi_agent.workflows defined in config.yaml
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+from pydantic import BaseModel, Field
+
+from .cache import ResponseCache
+from .llm import LLMRouter
+from .metrics import MetricsRecorder, estimate_tokens, get_recorder
+from .catalog import PersonaCatalog, get_catalog
+from .config import CONFIG_FILE, Settings, load_config
+from .timeouts import get_timeouts
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+MODES = ("sequential", "parallel", "hierarchical")
+
+# (persona, messages) -> reply text
+CompleteFn = Callable[[Dict[str, Any], List[Dict[str, str]]], Awaitable[str]]
+
+
+class WorkflowStep(BaseModel):
+    """One agent action inside a workflow"""
+    id: str
+    agent: str
+    action: str
+    depends_on: List[str] = Field(default_factory=list)
+
+
+class WorkflowDefinition(BaseModel):
+    """A workflow from config.yaml, with its steps resolved into a DAG"""
+    name: str
+    description: str = ""
+    mode: str = "sequential"
+    agents: List[str] = Field(default_factory=list)
+    steps: List[WorkflowStep] = Field(default_factory=list)
+    n8n_trigger: Optional[str] = None
+
+
+class StepResult(BaseModel):
+    """Output and timing of one executed step"""
+    id: str
+    agent: str
+    output: str = ""
+    error: Optional[str] = None
+    started_at: float = 0.0
+    duration: float = 0.0
+    model: Optional[str] = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached: bool = False
+
+
+class WorkflowResult(BaseModel):
+    """Outcome of a workflow run"""
+    workflow: str
+    mode: str
+    success: bool
+    output: str = ""
+    steps: List[StepResult] = Field(default_factory=list)
+    duration: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    webhook: Optional[Dict[str, Any]] = None
+
+
+def _build_steps(workflow: Dict[str, Any], mode: str) -> List[WorkflowStep]:
+    """
+    Turn a config.yaml workflow into DAG steps.
+
+    Explicit `depends_on` entries are kept as-is. Otherwise dependencies come
+    from the mode: sequential chains the steps, parallel runs them all at
+    once, and hierarchical lets the first agent plan, the others work on the
+    plan in parallel, and the first agent combine their results.
+    """
+    raw_steps = workflow.get("steps") or [
+        {"agent": agent, "action": f"Contribute your expertise to: {workflow.get('description', workflow['name'])}"}
+        for agent in workflow.get("agents", [])
+    ]
+    steps = [
+        WorkflowStep(
+            id=raw.get("id") or f"step{i + 1}",
+            agent=raw["agent"],
+            action=raw.get("action", ""),
+            depends_on=list(raw.get("depends_on") or []),
+        )
+        for i, raw in enumerate(raw_steps)
+    ]
+    if any("depends_on" in raw for raw in raw_steps):
+        return steps
+
+    if mode == "sequential":
+        for previous, step in zip(steps, steps[1:]):
+            step.depends_on = [previous.id]
+    elif mode == "hierarchical" and len(steps) > 1:
+        lead, workers = steps[0], steps[1:]
+        for worker in workers:
+            worker.depends_on = [lead.id]
+        steps.append(WorkflowStep(
+            id="synthesis",
+            agent=lead.agent,
+            action="Review the team's contributions and combine them into one final deliverable",
+            depends_on=[worker.id for worker in workers],
+        ))
+    return steps
+
+
+def load_workflows(config_path: Path = CONFIG_FILE, settings: Optional[Settings] = None) -> Dict[str, WorkflowDefinition]:
+    """Load multi_agent.workflows from config.yaml, keyed by name"""
+    multi_agent = (settings or load_config(config_path)).multi_agent
+    default_mode = multi_agent.collaboration_mode
+
+    workflows = {}
+    for workflow in multi_agent.workflows:
+        mode = workflow.get("mode", default_mode)
+        if mode not in MODES:
+            raise ValueError(f"Workflow '{workflow['name']}' has unknown mode '{mode}'")
+        workflows[workflow["name"]] = WorkflowDefinition(
+            name=workflow["name"],
+            description=workflow.get("description", ""),
+            mode=mode,
+            agents=workflow.get("agents") or [],
+            steps=_build_steps(workflow, mode),
+            n8n_trigger=workflow.get("n8n_trigger"),
+        )
+    return workflows
+
+
+class WorkflowEngine:
+    """
+    Async engine that runs workflows as a DAG of persona calls.
+    Independent steps run concurrently, bounded by max_concurrent_agents.
+    """
+
+    def __init__(
+        self,
+        complete: Optional[CompleteFn] = None,
+        config_path: Path = CONFIG_FILE,
+        cache: Optional[ResponseCache] = None,
+        registry: Optional[PersonaCatalog] = None,
+        router: Optional[LLMRouter] = None,
+        metrics: Optional[MetricsRecorder] = None,
+        settings: Optional[Settings] = None,
+    ):
+        self.settings = settings or load_config(config_path)
+
+        self.workflows = load_workflows(settings=self.settings)
+        self.registry = registry or get_catalog(config_path=config_path)
+        self.max_concurrent = self.settings.multi_agent.max_concurrent_agents
+        self.router = router or LLMRouter.from_settings(self.settings)
+        self.complete = complete
+        self.cache = cache
+        self.metrics = metrics or get_recorder()
+
+        self.n8n_enabled = self.settings.n8n.enabled
+
+    def _step_messages(
+        self,
+        persona: Dict[str, Any],
+        step: WorkflowStep,
+        task: str,
+        inputs: List[StepResult],
+    ) -> List[Dict[str, str]]:
+        prompt = f"{step.action}\n\nTask: {task}"
+        for result in inputs:
+            prompt += f"\n\n--- Input from {result.agent} ---\n{result.output}"
+        return [
+            {"role": "system", "content": persona["system_prompt"]},
+            {"role": "user", "content": prompt},
+        ]
+
+    async def run(self, workflow_name: str, task: str) -> WorkflowResult:
+        """Run a workflow on a task and fire its n8n trigger at the end"""
+        if workflow_name not in self.workflows:
+            raise KeyError(f"Unknown workflow '{workflow_name}'")
+        workflow = self.workflows[workflow_name]
+
+        # Resolve personas once per run so config.yaml persona edits apply to the next run
+        self.registry.refresh()
+        personas = {}
+        for agent in {step.agent for step in workflow.steps}:
+            persona = self.registry.by_name(agent)
+            if persona is not None:
+                personas[agent] = persona
+        missing = {step.agent for step in workflow.steps} - set(personas)
+        if missing:
+            raise KeyError(f"No persona definition for: {', '.join(sorted(missing))}")
+
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+        tasks: Dict[str, asyncio.Task] = {}
+        start = time.perf_counter()
+
+        async def run_step(step: WorkflowStep) -> StepResult:
+            inputs = [await tasks[dep] for dep in step.depends_on]
+            failed = [result.id for result in inputs if result.error]
+            if failed:
+                return StepResult(id=step.id, agent=step.agent,
+                                  error=f"Skipped: dependency {', '.join(failed)} failed")
+
+            persona = personas[step.agent]
+            async with semaphore:
+                started = time.perf_counter()
+                result = StepResult(id=step.id, agent=step.agent, started_at=started - start,
+                                    model=persona.get("model", "gpt-4"))
+                try:
+                    result.output = await self._complete(
+                        persona, self._step_messages(persona, step, task, inputs), result
+                    )
+                except Exception as e:
+                    result.error = str(e)
+                result.duration = time.perf_counter() - started
+
+            self.metrics.record_persona(
+                persona.get("role", step.agent), result.model, result.duration,
+                result.prompt_tokens, result.completion_tokens,
+                success=result.error is None, cached=result.cached,
+            )
+            return result
+
+        # Create every task up front; each awaits its own dependencies
+        for step in workflow.steps:
+            unknown = [dep for dep in step.depends_on if dep not in {s.id for s in workflow.steps}]
+            if unknown:
+                raise ValueError(f"Step '{step.id}' depends on unknown step(s): {', '.join(unknown)}")
+        for step in _topological_order(workflow.steps):
+            tasks[step.id] = asyncio.ensure_future(run_step(step))
+
+        try:
+            results = await asyncio.gather(*tasks.values())
+        except BaseException:
+            for pending in tasks.values():
+                pending.cancel()
+            raise
+
+        results_by_id = {result.id: result for result in results}
+        ordered = [results_by_id[step.id] for step in workflow.steps]
+        final = [results_by_id[step.id] for step in _leaf_steps(workflow.steps)]
+
+        result = WorkflowResult(
+            workflow=workflow.name,
+            mode=workflow.mode,
+            success=not any(r.error for r in ordered),
+            output="\n\n".join(
+                r.output if len(final) == 1 else f"## {r.agent}\n{r.output}"
+                for r in final if not r.error
+            ),
+            steps=ordered,
+            duration=time.perf_counter() - start,
+            prompt_tokens=sum(r.prompt_tokens for r in ordered),
+            completion_tokens=sum(r.completion_tokens for r in ordered),
+        )
+        self.metrics.record_workflow(
+            workflow.name, result.duration, result.prompt_tokens, result.completion_tokens,
+            success=result.success,
+        )
+
+        if workflow.n8n_trigger and result.success:
+            result.webhook = await self.fire_webhook(workflow.n8n_trigger, task, result)
+        return result
+
+    async def _complete(
+        self,
+        persona: Dict[str, Any],
+        messages: List[Dict[str, str]],
+        result: StepResult,
+    ) -> str:
+        """
+        Call the backend, going through the response cache for low-temperature
+        personas, and note token usage on the step result
+        """
+        temperature = persona.get("temperature", 0.7)
+
+        async def call() -> str:
+            result.cached = False
+            if self.complete is not None:
+                text = await self.complete(persona, messages)
+                prompt_tokens = completion_tokens = None
+            else:
+                completion = await self.router.complete(result.model, messages, temperature)
+                text = completion.text
+                prompt_tokens, completion_tokens = completion.prompt_tokens, completion.completion_tokens
+            # Estimate what the backend did not report
+            result.prompt_tokens = prompt_tokens or sum(estimate_tokens(m["content"]) for m in messages)
+            result.completion_tokens = completion_tokens or estimate_tokens(text)
+            return text
+
+        if self.cache is None or not self.cache.cacheable(temperature):
+            return await call()
+
+        key = self.cache.make_key(
+            result.model, messages[0]["content"],
+            messages[1:-1], messages[-1]["content"], temperature,
+        )
+        result.cached = True
+        return await self.cache.get_or_create(key, call)
+
+    async def aclose(self):
+        """Close pooled provider connections"""
+        await self.router.aclose()
+
+    async def fire_webhook(self, name: str, task: str, result: WorkflowResult) -> Dict[str, Any]:
+        """POST the workflow outcome to the named n8n webhook from config.yaml"""
+        if not self.n8n_enabled:
+            return {"success": False, "error": "n8n integration is disabled in config.yaml"}
+        hook = self.settings.n8n.webhook(name)
+        if hook is None:
+            return {"success": False, "error": f"Unknown n8n webhook '{name}'"}
+
+        url = self.settings.n8n.url(hook.endpoint)
+        started = time.perf_counter()
+        payload = {
+            "workflow": result.workflow,
+            "task": task,
+            "output": result.output,
+            "steps": [step.model_dump() for step in result.steps],
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
+        timer = get_timeouts().start(url, hook.timeout)
+        try:
+            async with httpx.AsyncClient(timeout=timer.timeout) as client:
+                try:
+                    response = await client.post(url, json=payload, extensions=timer.extensions)
+                except httpx.HTTPError as e:
+                    timer.done(e)
+                    raise
+                timer.done()
+                response.raise_for_status()
+                self.metrics.record_webhook(name, time.perf_counter() - started)
+                return {
+                    "success": True,
+                    "status_code": response.status_code,
+                    "execution_id": response.headers.get("x-n8n-execution-id"),
+                    "timeouts": timer.timeout.as_dict(),
+                }
+        except httpx.HTTPError as e:
+            self.metrics.record_webhook(name, time.perf_counter() - started, success=False)
+            return {"success": False, "error": str(e), "error_type": type(e).__name__,
+                    "timeouts": timer.timeout.as_dict()}
+
+
+def _topological_order(steps: List[WorkflowStep]) -> List[WorkflowStep]:
+    """Order steps so dependencies come first; raises on cycles"""
+    by_id = {step.id: step for step in steps}
+    ordered, visiting, done = [], set(), set()
+
+    def visit(step: WorkflowStep):
+        if step.id in done:
+            return
+        if step.id in visiting:
+            raise ValueError(f"Workflow has a dependency cycle at step '{step.id}'")
+        visiting.add(step.id)
+        for dep in step.depends_on:
+            visit(by_id[dep])
+        visiting.discard(step.id)
+        done.add(step.id)
+        ordered.append(step)
+
+    for step in steps:
+        visit(step)
+    return ordered
+
+
+def _leaf_steps(steps: List[WorkflowStep]) -> List[WorkflowStep]:
+    """Steps no other step depends on; their outputs form the final result"""
+    used = {dep for step in steps for dep in step.depends_on}
+    return [step for step in steps if step.id not in used]
+
+
+def print_report(result: WorkflowResult):
+    """Print per-step timings and the final output"""
+    print(f"\n🔀 {result.workflow} ({result.mode}) - {'✓ done' if result.success else '✗ failed'} "
+          f"in {result.duration:.2f}s, {result.prompt_tokens + result.completion_tokens} tokens\n")
+    for step in result.steps:
+        status = "✗ " + step.error if step.error else "✓ cached" if step.cached else "✓"
+        print(f"  {step.id:<12} {step.agent:<22} start +{step.started_at:6.2f}s  "
+              f"took {step.duration:6.2f}s  {step.prompt_tokens + step.completion_tokens:>6} tok  {status}")
+    if result.webhook:
+        hook = result.webhook
+        print(f"\n  n8n: {'✓ triggered' if hook.get('success') else '✗ ' + str(hook.get('error'))}")
+        if hook.get("timeouts"):
+            print("       timeouts: " + " ".join(f"{kind}={value:.2f}s" for kind, value in hook["timeouts"].items()))
+    print(f"\n{result.output}\n")
+
+
+def main():
+    """Command-line entry point: python -m multi_agent.orchestrator"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a multi-agent workflow from config.yaml")
+    parser.add_argument("workflow", nargs="?", help="Workflow name (omit to list workflows)")
+    parser.add_argument("task", nargs="?", help="Task or brief passed to the first step(s)")
+    parser.add_argument("--config", type=Path, default=CONFIG_FILE)
+    parser.add_argument("--usage", action="store_true",
+                        help="Print recorded token and latency usage and exit")
+    args = parser.parse_args()
+
+    if args.usage:
+        print(get_recorder().format_report())
+        return
+
+    try:
+        from dotenv import load_dotenv
+        load_dotenv(ROOT_DIR / ".env")
+    except ImportError:
+        pass
+
+    # Show this package's INFO logs (e.g. adaptive timeout changes) without httpx's request lines
+    logging.basicConfig(format="%(name)s: %(message)s")
+    logging.getLogger("multi_agent").setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+    engine = WorkflowEngine(config_path=args.config)
+
+    if not args.workflow:
+        print("Available workflows:")
+        for workflow in engine.workflows.values():
+            print(f"  - {workflow.name} ({workflow.mode}, {len(workflow.steps)} steps)")
+        return
+
+    task = args.task or input("Task: ").strip()
+
+    async def run_and_close() -> WorkflowResult:
+        try:
+            return await engine.run(args.workflow, task)
+        finally:
+            await engine.aclose()
+
+    try:
+        result = asyncio.run(run_and_close())
+    except (KeyError, ValueError) as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+    print_report(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Adaptive Timeouts
+Per-endpoint httpx timeouts derived from the latency each endpoint shows
+"""
+
+import bisect
+import logging
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds: 1 ms to ~8 min, 20% apart
+BUCKETS = tuple(0.001 * 1.2 ** i for i in range(72))
+
+
+class LatencyHistogram:
+    """
+    Rolling histogram of the last `window` samples. Samples are kept as
+    bucket indices, so eviction is O(1) and a percentile is a walk over
+    the bucket counters; values are rounded up to their bucket bound.
+    """
+
+    def __init__(self, window: int = 500):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.samples = deque(maxlen=window)
+
+    def add(self, seconds: float):
+        index = bisect.bisect_left(BUCKETS, seconds)
+        if len(self.samples) == self.samples.maxlen:
+            self.counts[self.samples[0]] -= 1
+        self.samples.append(index)
+        self.counts[index] += 1
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        rank = max(1, math.ceil(len(self.samples) * pct / 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return BUCKETS[min(index, len(BUCKETS) - 1)]
+        return BUCKETS[-1]
+
+
+class RequestTimer:
+    """
+    The timeouts for one request plus an httpx `trace` hook that measures
+    its connect time (TCP + TLS) and its response time (request sent to
+    response headers). Pass `timeout` and `extensions` to the request and
+    call done() once it finished.
+    """
+
+    def __init__(self, owner: "AdaptiveTimeouts", endpoint: str, timeout: httpx.Timeout):
+        self.owner = owner
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.connect: Optional[float] = None
+        self.response: Optional[float] = None
+        self._mark = time.perf_counter()
+
+    @property
+    def extensions(self) -> Dict[str, Any]:
+        return {"trace": self._trace}
+
+    async def _trace(self, event: str, info: Dict[str, Any]):
+        now = time.perf_counter()
+        if event == "connection.connect_tcp.started":
+            self._mark = now
+        elif event in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+            self.connect = now - self._mark
+        elif event.endswith(".send_request_body.complete"):
+            self._mark = now
+        elif event.endswith(".receive_response_headers.complete"):
+            self.response = now - self._mark
+
+    def done(self, error: Optional[BaseException] = None):
+        """Feed the measurements (or the timeout that cut the request short) back"""
+        self.owner.observe(self, error)
+
+
+class AdaptiveTimeouts:
+    """
+    Chooses connect, read and pool timeouts per endpoint (a URL); write
+    keeps the configured timeout, since it depends on the body size.
+
+    Each bound is `factor` times the p`percentile` of the endpoint's
+    recent connect or response times, clamped between a floor and the
+    endpoint's configured timeout, so adapting only ever tightens what the
+    operator set. Until `min_samples` responses were seen, or when
+    disabled, read uses the configured timeout and connect/pool use
+    min(configured, max_connect). A request that times out counts as a
+    sample at the bound it hit, so bounds back off when they are too tight.
+    Chosen values are logged (INFO) whenever they move by more than 20%;
+    callers also report each request's values (`RequestTimer.timeout`).
+    """
+
+    def __init__(self, enabled: bool = False, factor: float = 3.0, percentile: float = 99.0,
+                 min_samples: int = 20, window: int = 500, min_connect: float = 0.5,
+                 max_connect: float = 10.0, min_read: float = 1.0):
+        self.enabled = enabled
+        self.factor = factor
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.window = window
+        self.min_connect = min_connect
+        self.max_connect = max_connect
+        self.min_read = min_read
+        self._connect: Dict[str, LatencyHistogram] = {}
+        self._response: Dict[str, LatencyHistogram] = {}
+        self._logged: Dict[str, httpx.Timeout] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings) -> "AdaptiveTimeouts":
+        section = settings.n8n.adaptive_timeouts
+        return cls(**section.model_dump(exclude=set(section.model_extra or ())))
+
+    def _bound(self, histogram: Optional[LatencyHistogram], floor: float, ceiling: float) -> Optional[float]:
+        if not self.enabled or histogram is None or len(histogram) < self.min_samples:
+            return None
+        return min(ceiling, max(floor, histogram.percentile(self.percentile) * self.factor))
+
+    def timeout(self, endpoint: str, ceiling: float) -> httpx.Timeout:
+        """The timeouts to use for the next request to `endpoint`"""
+        connect_ceiling = min(ceiling, self.max_connect)
+        with self._lock:
+            connect = self._bound(self._connect.get(endpoint), self.min_connect, connect_ceiling)
+            read = self._bound(self._response.get(endpoint), self.min_read, ceiling)
+            connect = connect or connect_ceiling
+            read = read or ceiling
+            chosen = httpx.Timeout(connect=connect, read=read, write=ceiling, pool=connect)
+
+            if not self.enabled:
+                return chosen
+            last = self._logged.get(endpoint)
+            changed = (last is None or abs(last.read - read) > 0.2 * last.read
+                       or abs(last.connect - connect) > 0.2 * last.connect)
+            if changed:
+                self._logged[endpoint] = chosen
+                description = self._describe(endpoint)
+        if changed:
+            logger.info("timeouts for %s: connect=%.2fs read=%.2fs write=%.2fs pool=%.2fs (%s)",
+                        endpoint, connect, read, ceiling, connect, description)
+        return chosen
+
+    def _describe(self, endpoint: str) -> str:
+        histogram = self._response.get(endpoint)
+        if histogram is None or len(histogram) < self.min_samples:
+            return f"{len(histogram or ())}/{self.min_samples} samples, using configured bounds"
+        connect = self._connect.get(endpoint)
+        connect_p = connect.percentile(self.percentile) if connect else None
+        return (f"p{self.percentile:g} response {histogram.percentile(self.percentile):.3f}s, connect "
+                f"{f'{connect_p:.3f}s' if connect_p is not None else 'n/a'} over {len(histogram)} samples")
+
+    def start(self, url: str, ceiling: float) -> RequestTimer:
+        """Timeouts and tracing for one request to `url` (query string ignored)"""
+        endpoint = url.split("?", 1)[0]
+        return RequestTimer(self, endpoint, self.timeout(endpoint, ceiling))
+
+    def observe(self, timer: RequestTimer, error: Optional[BaseException] = None):
+        connect, response = timer.connect, timer.response
+        if isinstance(error, httpx.ConnectTimeout):
+            connect = timer.timeout.connect
+        elif isinstance(error, httpx.ReadTimeout):
+            response = timer.timeout.read
+        elif error is not None and not isinstance(error, httpx.HTTPStatusError):
+            return  # failed for another reason: says nothing about latency
+
+        with self._lock:
+            if connect is not None:
+                self._histogram(self._connect, timer.endpoint).add(connect)
+            if response is not None:
+                self._histogram(self._response, timer.endpoint).add(response)
+
+    def _histogram(self, table: Dict[str, LatencyHistogram], endpoint: str) -> LatencyHistogram:
+        histogram = table.get(endpoint)
+        if histogram is None:
+            histogram = table[endpoint] = LatencyHistogram(self.window)
+        return histogram
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Per endpoint: sample count, observed percentile and the current adaptive bounds"""
+        report = {}
+        with self._lock:
+            for endpoint, histogram in self._response.items():
+                connect = self._connect.get(endpoint)
+                report[endpoint] = {
+                    "samples": len(histogram),
+                    "response_p": histogram.percentile(self.percentile),
+                    "connect_p": connect.percentile(self.percentile) if connect else None,
+                    "connect": self._bound(connect, self.min_connect, self.max_connect),
+                    "read": self._bound(histogram, self.min_read, math.inf),
+                }
+        return report
+
+
+_timeouts: Optional[AdaptiveTimeouts] = None
+_timeouts_lock = threading.Lock()
+
+
+def get_timeouts() -> AdaptiveTimeouts:
+    """Return the process-wide timeouts, configured from config.yaml n8n.adaptive_timeouts"""
+    global _timeouts
+    with _timeouts_lock:
+        if _timeouts is None:
+            from .config import load_config
+
+            _timeouts = AdaptiveTimeouts.from_settings(load_config())
+        return _timeouts
@@ -5,58 +5,427 @@ Works with existing dependencies while Open WebUI installs
 """
 
 import os
-import json
+import time
+import threading
+from collections import deque
 from pathlib import Path
 
-# Load environment variables
-from dotenv import load_dotenv
-load_dotenv()
+# The provider layer (httpx, pydantic) dominates start-up time, so it is
+# imported and the router created on first use; main() warms it up in the
+# background once the menu is on screen. asyncio, dotenv and the optional
+# packages (tiktoken, yaml) are imported when needed as well; .env is
+# loaded by main() before anything reads the environment.
+router = None
+_router_error = None
+_router_lock = threading.Lock()
 
-try:
-    from openai import OpenAI
-    HAS_OPENAI = True
-except:
-    HAS_OPENAI = False
+settings = None
+_settings_lock = threading.Lock()
 
-# Initialize OpenAI client
-if HAS_OPENAI and os.getenv('OPENAI_API_KEY'):
-    client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-else:
-    print("⚠️  OpenAI not available. Install with: pip install openai")
-    client = None
+def get_settings():
+    """The config.yaml snapshot, parsed (with ${VAR} resolved) on first use"""
+    global settings
+    with _settings_lock:
+        if settings is None:
+            from multi_agent.config import load_config
+            settings = load_config(CONFIG_FILE)
+        return settings
 
-# Load personas
-PERSONAS_DIR = Path(__file__).parent / "data" / "personas"
+def get_router():
+    """Return the LLM router built from config.yaml (None if unavailable)"""
+    global router, _router_error
+    with _router_lock:
+        if router is None and _router_error is None:
+            try:
+                from multi_agent.llm import LLMRouter
+                router = LLMRouter.from_settings(get_settings())
+            except ImportError as e:
+                _router_error = f"Missing dependency ({e.name}). Install with: pip install httpx pyyaml pydantic"
+            except Exception as e:
+                _router_error = str(e)
+        return router
 
-def load_personas():
-    """Load all persona definitions"""
-    personas = {}
-    for file in PERSONAS_DIR.glob("*.json"):
-        with open(file) as f:
-            persona = json.load(f)
-            personas[persona['role']] = persona
-    return personas
-
-def chat_with_persona(persona, message):
-    """Chat with a specific persona"""
-    if not client:
-        return "Error: OpenAI client not initialized. Check your API key."
+# All provider calls run on one event loop owned by the CLI, so pooled
+# connections are reused from one message to the next
+_loop = None
+
+def get_loop():
+    """The CLI's event loop, created on first use"""
+    global _loop
+    if _loop is None:
+        import asyncio
+        _loop = asyncio.new_event_loop()
+    return _loop
 
+def run_async(coro):
+    """Run a coroutine on the CLI's event loop; Ctrl+C cancels it"""
+    loop = get_loop()
+    task = loop.create_task(coro)
     try:
-        response = client.chat.completions.create(
-            model=persona.get('model', 'gpt-4'),
-            messages=[
-                {"role": "system", "content": persona['system_prompt']},
-                {"role": "user", "content": message}
-            ],
-            temperature=persona.get('temperature', 0.7)
+        return loop.run_until_complete(task)
+    except KeyboardInterrupt:
+        task.cancel()
+        try:
+            loop.run_until_complete(task)
+        except BaseException:
+            pass
+        raise
+
+CONFIG_FILE = Path(__file__).parent / "config.yaml"
+
+# Reply cache, configured from config.yaml multi_agent.cache on first use
+response_cache = None
+_cache_lock = threading.Lock()
+
+def get_response_cache():
+    """The persona reply cache; LITE_CACHE_* variables override config.yaml"""
+    global response_cache
+    with _cache_lock:
+        if response_cache is None:
+            from multi_agent.cache import ResponseCache
+            section = get_settings().multi_agent.cache
+            response_cache = ResponseCache(
+                max_entries=int(os.getenv('LITE_CACHE_SIZE', section.max_entries)),
+                ttl=float(os.getenv('LITE_CACHE_TTL', section.ttl)),
+                max_temperature=float(os.getenv('LITE_CACHE_MAX_TEMPERATURE', section.max_temperature))
+            )
+        return response_cache
+
+def get_metrics():
+    """Token and latency accounting per persona and workflow (see 'report')"""
+    from multi_agent.metrics import get_recorder
+    return get_recorder()
+
+# Print tokens as they arrive (toggle with the 'stream' command)
+STREAM_RESPONSES = True
+
+# Conversation memory: token budget for past turns sent with each message,
+# and whether turns that fall out of the window are folded into a summary
+HISTORY_TOKENS = 3000
+SUMMARIZE_HISTORY = False
+SUMMARY_MODEL = 'gpt-3.5-turbo'
+
+def load_env():
+    """Load .env into the environment and read the LITE_* options from it"""
+    global STREAM_RESPONSES, HISTORY_TOKENS, SUMMARIZE_HISTORY, SUMMARY_MODEL
+    from dotenv import load_dotenv
+    load_dotenv()
+    STREAM_RESPONSES = os.getenv('LITE_STREAM', 'true').lower() != 'false'
+    HISTORY_TOKENS = int(os.getenv('LITE_HISTORY_TOKENS', '3000'))
+    SUMMARIZE_HISTORY = os.getenv('LITE_SUMMARIZE', 'false').lower() == 'true'
+    SUMMARY_MODEL = os.getenv('LITE_SUMMARY_MODEL', 'gpt-3.5-turbo')
+
+_encodings = {}
+_tiktoken = None
+
+def count_tokens(text, model='gpt-4'):
+    """Count tokens with tiktoken when installed, otherwise estimate ~4 chars/token"""
+    global _tiktoken
+    if _tiktoken is None:
+        try:
+            import tiktoken as _tiktoken
+        except ImportError:
+            _tiktoken = False
+
+    if _tiktoken:
+        if model not in _encodings:
+            try:
+                _encodings[model] = _tiktoken.encoding_for_model(model)
+            except KeyError:
+                _encodings[model] = _tiktoken.get_encoding("cl100k_base")
+        return len(_encodings[model].encode(text))
+    return len(text) // 4 + 1
+
+
+class ConversationMemory:
+    """
+    Sliding window of past turns for one persona, bounded by a token budget.
+
+    Token counts are computed once when a turn is added and kept next to it,
+    so trimming only subtracts cached counts from a running total. Turns that
+    fall out of the window are passed to `summarize` (if given), whose result
+    is sent as a system message ahead of the window.
+    """
+
+    # Per-message overhead of the chat format (role, separators)
+    MESSAGE_OVERHEAD = 4
+
+    def __init__(self, max_tokens, model='gpt-4', summarize=None):
+        self.max_tokens = max_tokens
+        self.model = model
+        self.summarize = summarize
+        self.turns = deque()  # (user_message, assistant_message, tokens)
+        self.total_tokens = 0
+        self.summary = ""
+
+    def add_turn(self, user_text, assistant_text):
+        """Record a completed exchange and trim the window to the budget"""
+        tokens = (
+            count_tokens(user_text, self.model)
+            + count_tokens(assistant_text, self.model)
+            + 2 * self.MESSAGE_OVERHEAD
+        )
+        self.turns.append((
+            {"role": "user", "content": user_text},
+            {"role": "assistant", "content": assistant_text},
+            tokens
+        ))
+        self.total_tokens += tokens
+        self._trim()
+
+    def _trim(self):
+        evicted = []
+        while self.turns and self.total_tokens > self.max_tokens:
+            user_message, assistant_message, tokens = self.turns.popleft()
+            self.total_tokens -= tokens
+            evicted.append((user_message, assistant_message))
+
+        if evicted and self.summarize:
+            try:
+                self.summary = self.summarize(self.summary, evicted)
+            except Exception as e:
+                print(f"⚠️  Could not summarize earlier turns: {e}")
+
+    def messages(self):
+        """Messages to send between the system prompt and the new user message"""
+        messages = []
+        if self.summary:
+            messages.append({
+                "role": "system",
+                "content": f"Summary of the earlier conversation:\n{self.summary}"
+            })
+        for user_message, assistant_message, _ in self.turns:
+            messages.append(user_message)
+            messages.append(assistant_message)
+        return messages
+
+    def clear(self):
+        self.turns.clear()
+        self.total_tokens = 0
+        self.summary = ""
+
+
+def summarize_turns(summary, turns):
+    """Fold evicted turns into the rolling conversation summary"""
+    transcript = "\n".join(
+        f"User: {user['content']}\nAssistant: {assistant['content']}"
+        for user, assistant in turns
+    )
+    completion = run_async(get_router().complete(
+        SUMMARY_MODEL,
+        [
+            {"role": "system", "content": (
+                "Update the running summary of a conversation with the new exchanges. "
+                "Keep names, decisions, facts and open questions. Reply with the summary only."
+            )},
+            {"role": "user", "content": f"Current summary:\n{summary or '(none)'}\n\nNew exchanges:\n{transcript}"}
+        ],
+        temperature=0.2,
+        max_tokens=300
+    ))
+    return completion.text.strip()
+
+
+def new_memory(persona):
+    """Create the conversation memory for a persona"""
+    return ConversationMemory(
+        HISTORY_TOKENS,
+        model=persona.get('model', 'gpt-4'),
+        summarize=summarize_turns if SUMMARIZE_HISTORY else None
+    )
+
+def load_personas():
+    """Persona definitions by role from the compiled catalog, recompiled when config.yaml changes"""
+    from multi_agent.catalog import get_catalog
+    return get_catalog(config_path=CONFIG_FILE)
+
+def chat_with_persona(persona, message, stream=False, memory=None):
+    """Chat with a specific persona, optionally continuing a conversation"""
+    router = get_router()
+    if not router:
+        return f"Error: LLM providers not available. {_router_error}"
+
+    messages = [
+        {"role": "system", "content": persona['system_prompt']},
+        *(memory.messages() if memory else []),
+        {"role": "user", "content": message}
+    ]
+
+    # Personas up to the cache's max temperature answer the same question
+    # the same way, so their replies are served from the local cache
+    cache_key = None
+    temperature = persona.get('temperature', 0.7)
+    cache = get_response_cache()
+    if cache.cacheable(temperature):
+        cache_key = cache.make_key(
+            persona.get('model', 'gpt-4'), persona['system_prompt'],
+            messages[1:-1], message, temperature
         )
-        return response.choices[0].message.content
+        reply = cache.get(cache_key)
+        if reply is not None:
+            record_usage(persona, messages, cached=True)
+            if stream:
+                print(f"{persona['avatar']} {persona['name']}: {reply}\n   ⚡ cached")
+            if memory is not None:
+                memory.add_turn(message, reply)
+            return reply
+
+    start = time.perf_counter()
+    try:
+        if stream:
+            completion = stream_chat(router, persona, messages)
+        else:
+            completion = run_async(router.complete(
+                persona.get('model', 'gpt-4'), messages, temperature
+            ))
     except Exception as e:
+        record_usage(persona, messages, latency=time.perf_counter() - start, success=False)
         return f"Error: {str(e)}"
 
+    record_usage(persona, messages, completion)
+    reply = completion.text
+
+    if cache_key and reply and completion.finished:
+        cache.put(cache_key, reply)
+
+    if memory is not None and reply:
+        memory.add_turn(message, reply)
+    return reply
+
+def record_usage(persona, messages, completion=None, latency=0.0, success=True, cached=False):
+    """Add one persona call to the metrics, estimating tokens the provider did not report"""
+    model = persona.get('model', 'gpt-4')
+    prompt_tokens = completion_tokens = 0
+    if completion is not None:
+        prompt_tokens = completion.prompt_tokens or sum(
+            count_tokens(m['content'], model) for m in messages
+        )
+        completion_tokens = completion.completion_tokens or count_tokens(completion.text, model)
+        latency = completion.latency
+    get_metrics().record_persona(
+        persona['role'], model, latency, prompt_tokens, completion_tokens,
+        success=success, cached=cached
+    )
+    return prompt_tokens, completion_tokens
+
+def stream_chat(router, persona, messages):
+    """
+    Stream a reply to the terminal as tokens arrive.
+    Ctrl+C stops the reply but keeps the session.
+    Returns the Completion (finished=False if it was interrupted).
+    """
+    print(f"{persona['avatar']} {persona['name']}: ", end="", flush=True)
+
+    chunks = 0
+    stream = router.stream(
+        persona.get('model', 'gpt-4'), messages, persona.get('temperature', 0.7)
+    )
+
+    # One loop iteration per chunk keeps Ctrl+C handling in plain sync code
+    try:
+        while True:
+            try:
+                delta = run_async(stream.__anext__())
+            except StopAsyncIteration:
+                break
+            chunks += 1
+            print(delta, end="", flush=True)
+    except KeyboardInterrupt:
+        print("\n⏹️  Interrupted", end="")
+    finally:
+        run_async(stream.aclose())
+
+    print()
+
+    completion = stream.completion
+    if completion.first_token_latency is not None:
+        # Usage is only sent at the end of the stream; count chunks if cut short
+        tokens = (completion.completion_tokens if completion.finished else None) or chunks
+        generation_time = completion.latency - completion.first_token_latency
+        rate = tokens / generation_time if generation_time > 0 else 0.0
+        print(f"   ⏱️  first token {completion.first_token_latency:.2f}s · "
+              f"{rate:.1f} tok/s · {tokens} tokens")
+
+    return completion
+
+def load_max_concurrent_agents(default=5):
+    """multi_agent.max_concurrent_agents from the config snapshot"""
+    try:
+        return get_settings().multi_agent.max_concurrent_agents
+    except ImportError:
+        return default
+
+async def run_panel(personas, message, max_concurrent):
+    """
+    Send one prompt to every persona concurrently, at most max_concurrent
+    at a time, printing each answer as soon as it completes.
+    """
+    import asyncio
+
+    router = get_router()
+    semaphore = asyncio.Semaphore(max_concurrent)
+    start = time.perf_counter()
+    usage = [0, 0]  # prompt and completion tokens across the panel
+    failed = False
+
+    async def complete(persona, messages):
+        completion = await router.complete(
+            persona.get('model', 'gpt-4'), messages, persona.get('temperature', 0.7)
+        )
+        prompt_tokens, completion_tokens = record_usage(persona, messages, completion)
+        usage[0] += prompt_tokens
+        usage[1] += completion_tokens
+        return completion.text
+
+    async def ask(persona):
+        nonlocal failed
+        async with semaphore:
+            sent = time.perf_counter()
+            temperature = persona.get('temperature', 0.7)
+            messages = [
+                {"role": "system", "content": persona['system_prompt']},
+                {"role": "user", "content": message}
+            ]
+            called = False
+
+            async def create():
+                nonlocal called
+                called = True
+                return await complete(persona, messages)
+
+            try:
+                cache = get_response_cache()
+                if cache.cacheable(temperature):
+                    key = cache.make_key(
+                        persona.get('model', 'gpt-4'), persona['system_prompt'],
+                        [], message, temperature
+                    )
+                    reply = await cache.get_or_create(key, create)
+                    if not called:
+                        # Served from the cache or by an identical request in flight
+                        record_usage(persona, messages, cached=True)
+                else:
+                    reply = await complete(persona, messages)
+            except Exception as e:
+                record_usage(persona, messages, latency=time.perf_counter() - sent, success=False)
+                failed = True
+                reply = f"Error: {str(e)}"
+            return persona, reply, time.perf_counter() - sent
+
+    for finished in asyncio.as_completed([ask(p) for p in personas.values()]):
+        persona, reply, latency = await finished
+        print(f"{persona['avatar']} {persona['name']} ({latency:.2f}s): {reply}")
+        print()
+
+    duration = time.perf_counter() - start
+    get_metrics().record_workflow("panel", duration, usage[0], usage[1], success=not failed)
+    print(f"   ⏱️  panel of {len(personas)} answered in {duration:.2f}s "
+          f"(max {max_concurrent} concurrent)")
+
 def main():
     """Main chat interface"""
+    load_env()
+
     print("\n" + "="*60)
     print("🤖 Multi-Agent Workspace - Lite Version")
     print("="*60)
@@ -76,17 +445,29 @@ def main():
     print("Commands:")
     print("  'switch' - Change persona")
     print("  'list' - Show available personas")
+    print("  'stream' - Toggle streaming replies (Ctrl+C stops a reply)")
+    print("  'reset' - Forget the conversation with the current persona")
+    print("  'panel <message>' - Ask every persona at once")
+    print("  'cache' - Show reply cache hit rate")
+    print("  'report' - Token and latency usage per persona and workflow")
     print("  'quit' - Exit")
     print()
     print("="*60)
     print()
 
+    # Import the provider layer while the user reads the menu and types
+    threading.Thread(target=get_router, daemon=True).start()
+
     # Select initial persona
     roles = list(personas.keys())
-    current_persona = personas[roles[0]]
+    current_role = roles[0]
+    current_persona = personas[current_role]
 
     print(f"\n🤖 Chatting with: {current_persona['name']}\n")
 
+    stream = STREAM_RESPONSES
+    memories = {}
+
     while True:
         try:
             user_input = input("You: ").strip()
@@ -94,6 +475,17 @@ def main():
             if not user_input:
                 continue
 
+            # Pick up persona files edited, added or removed since the last turn
+            if personas.refresh():
+                roles = list(personas.keys())
+                if not roles:
+                    print("❌ No personas found. Run setup.py first.")
+                    continue
+                if current_role not in personas:
+                    current_role = roles[0]
+                    print(f"\n🤖 Persona removed, now chatting with: {personas[current_role]['name']}\n")
+                current_persona = personas[current_role]
+
             if user_input.lower() == 'quit':
                 print("\n👋 Goodbye!\n")
                 break
@@ -105,6 +497,45 @@ def main():
                 print()
                 continue
 
+            if user_input.lower() == 'stream':
+                stream = not stream
+                print(f"\nStreaming {'on' if stream else 'off'}\n")
+                continue
+
+            if user_input.lower() == 'report':
+                metrics = get_metrics()
+                print(f"\n📊 Usage ({metrics.path}):\n")
+                print(metrics.format_report())
+                print()
+                continue
+
+            if user_input.lower() == 'cache':
+                cache = get_response_cache()
+                stats = cache.stats()
+                print(f"\n⚡ Reply cache: {stats['hit_rate']:.0%} hit rate "
+                      f"({stats['hits']} hits, {stats['coalesced']} coalesced, "
+                      f"{stats['misses']} misses, {stats['entries']} entries)")
+                print(f"   Cached personas: temperature <= {cache.max_temperature}\n")
+                continue
+
+            if user_input.lower() == 'reset':
+                memories.pop(current_role, None)
+                print(f"\n🧹 Conversation with {current_persona['name']} cleared\n")
+                continue
+
+            if user_input.lower() == 'panel' or user_input.lower().startswith('panel '):
+                message = user_input[len('panel'):].strip() or input("Panel prompt: ").strip()
+                if not get_router():
+                    print(f"Error: LLM providers not available. {_router_error}")
+                elif message:
+                    print()
+                    try:
+                        run_async(run_panel(personas, message, load_max_concurrent_agents()))
+                    except KeyboardInterrupt:
+                        print("\n⏹️  Panel interrupted")
+                    print()
+                continue
+
             if user_input.lower() == 'switch':
                 print("\nSelect persona:")
                 for i, (role, persona) in enumerate(personas.items(), 1):
@@ -113,7 +544,8 @@ def main():
                 try:
                     choice = int(input("\nEnter number: ")) - 1
                     if 0 <= choice < len(roles):
-                        current_persona = personas[roles[choice]]
+                        current_role = roles[choice]
+                        current_persona = personas[current_role]
                         print(f"\n🤖 Now chatting with: {current_persona['name']}\n")
                     else:
                         print("Invalid choice")
@@ -123,8 +555,17 @@ def main():
 
             # Chat with persona
             print()
-            response = chat_with_persona(current_persona, user_input)
-            print(f"{current_persona['avatar']} {current_persona['name']}: {response}")
+            if current_role not in memories:
+                memories[current_role] = new_memory(current_persona)
+            memory = memories[current_role]
+
+            if stream and get_router():
+                response = chat_with_persona(current_persona, user_input, stream=True, memory=memory)
+                if response.startswith("Error:"):
+                    print(response)
+            else:
+                response = chat_with_persona(current_persona, user_input, memory=memory)
+                print(f"{current_persona['avatar']} {current_persona['name']}: {response}")
             print()
 
         except KeyboardInterrupt:
@@ -133,5 +574,12 @@ def main():
         except Exception as e:
             print(f"\nError: {e}\n")
 
+    # Close pooled provider connections
+    if router is not None:
+        run_async(router.aclose())
+    if _loop is not None:
+        _loop.run_until_complete(_loop.shutdown_asyncgens())
+        _loop.close()
+
 if __name__ == "__main__":
     main()
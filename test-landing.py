@@ -2,80 +2,675 @@
 """
 Simple test server to demonstrate the landing page approach
 - Landing page on http://localhost:8081
-- Proxies /workspace to http://localhost:8080 (your running Open WebUI)
+- Proxies everything else (/workspace, /api, /ws, ...) to Open WebUI on
+  http://127.0.0.1:3000, mirroring nginx.conf
+
+Each connection is handled in its own thread, so one slow client does not
+stall the others. static/ and the landing build are indexed at startup:
+every file is held in memory (memory-mapped above MMAP_THRESHOLD) with its
+MIME type, ETag and compressed variants, so a request is a dict lookup and
+a write; `--watch` picks up changes on disk.
+
+Responses carry strong ETags and Last-Modified, so repeat visits get 304s;
+Range requests are honoured, and precompressed `<file>.br` / `<file>.gz`
+siblings (e.g. from the build) are served to clients that accept them;
+small text files without one are gzipped in memory.
+
+Proxied requests reuse pooled keep-alive upstream connections and stream
+bodies in both directions without buffering (nginx `proxy_buffering off`);
+WebSocket upgrades are relayed as raw byte streams.
 """
 
-from http.server import HTTPServer, SimpleHTTPRequestHandler
-import urllib.request
-import urllib.error
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Dict, NamedTuple, Union
+import argparse
+import gzip
+import hashlib
+import mimetypes
 import os
+import http.client
+import mmap
+import re
+import socket
+import threading
+import time
+import urllib.parse
+
+ROOT = Path(__file__).resolve().parent
+
+# React build output (landing/build-landing.sh), as served by nginx.conf;
+# falls back to a plain landing/index.html
+LANDING_DIR = ROOT / 'landing' / 'dist' if (ROOT / 'landing' / 'dist').is_dir() else ROOT / 'landing'
+STATIC_DIR = ROOT / 'static'
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.ico', '.svg')
+
+# Open WebUI (nginx.conf `upstream openwebui`) and its proxy timeouts
+UPSTREAM = os.getenv('LANDING_UPSTREAM', 'http://127.0.0.1:3000')
+PROXY_CONNECT_TIMEOUT = 60
+PROXY_READ_TIMEOUT = 60
+
+HOP_BY_HOP = {'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+              'proxy-connection', 'te', 'trailer', 'transfer-encoding', 'upgrade'}
+
+# Set by the proxy from the client request (nginx proxy_set_header)
+FORWARDED = {'host', 'x-real-ip', 'x-forwarded-for', 'x-forwarded-proto',
+             'x-forwarded-host', 'x-forwarded-port'}
+
+# Types the platform mimetypes database may lack or get wrong
+mimetypes.add_type('text/javascript', '.js')
+mimetypes.add_type('text/javascript', '.mjs')
+mimetypes.add_type('text/css', '.css')
+mimetypes.add_type('image/svg+xml', '.svg')
+mimetypes.add_type('image/webp', '.webp')
+mimetypes.add_type('font/woff2', '.woff2')
+mimetypes.add_type('application/manifest+json', '.webmanifest')
+
+
+def guess_type(path):
+    """MIME type for a file, with a charset for text formats"""
+    mime, _ = mimetypes.guess_type(str(path))
+    mime = mime or 'application/octet-stream'
+    if mime.startswith('text/') or mime in ('application/json', 'application/manifest+json', 'image/svg+xml'):
+        mime += '; charset=utf-8'
+    return mime
+
+
+# Immutable build output is cached for a year (as in nginx.conf);
+# everything else is revalidated with its ETag
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+
+# Precompressed siblings, in order of preference
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+# Text types worth gzipping in memory when the build ships no .gz sibling
+COMPRESSIBLE = ('text/', 'application/json', 'application/manifest+json', 'image/svg+xml')
+
+def accepted_encodings(header):
+    """Content codings the client accepts (q > 0)"""
+    accepted = set()
+    for part in (header or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        q = re.search(r'q=([0-9.]+)', params)
+        if coding and (not q or float(q.group(1)) > 0):
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def parse_range(header, size):
+    """
+    (start, end) of a single `bytes=` range, None to ignore the header
+    (absent, malformed or multi-range), or 'unsatisfiable'.
+    """
+    match = re.fullmatch(r'bytes=(\d*)-(\d*)', (header or '').strip())
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first == '':
+        length = int(last)
+        if length == 0:
+            return 'unsatisfiable'
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return 'unsatisfiable'
+    return start, end
+
+
+# Files up to this size are held as bytes; larger ones are memory-mapped
+MMAP_THRESHOLD = 256 * 1024
+
+# Build output and hidden files are not part of the site
+SKIP_DIRS = {'node_modules', '__pycache__'}
+
+
+class Asset(NamedTuple):
+    """One servable file: its content (bytes or mmap) and response metadata"""
+    data: Union[bytes, mmap.mmap]
+    mime: str
+    etag: str
+    last_modified: str
+    mtime: float
+    variants: Dict[str, 'Asset']  # content coding -> precompressed Asset
+
+    @property
+    def size(self):
+        return len(self.data)
+
+
+def load_asset(path, stat, mime, variants=None):
+    """Read (or map) a file and compute its validators"""
+    if stat.st_size > MMAP_THRESHOLD:
+        with open(path, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    else:
+        data = path.read_bytes()
+    etag = f'"{hashlib.blake2b(data, digest_size=12).hexdigest()}"'
+    return Asset(data, mime, etag, formatdate(stat.st_mtime, usegmt=True), stat.st_mtime, variants or {})
+
+
+def gzip_asset(asset):
+    """In-memory gzip variant of a small text asset, or None if it does not pay off"""
+    if isinstance(asset.data, mmap.mmap) or not asset.mime.startswith(COMPRESSIBLE):
+        return None
+    data = gzip.compress(asset.data, 9, mtime=0)
+    if len(data) > asset.size * 0.9:
+        return None
+    etag = f'"{hashlib.blake2b(data, digest_size=12).hexdigest()}"'
+    return asset._replace(data=data, etag=etag, variants={})
+
+
+class AssetIndex:
+    """
+    Every file under a directory, loaded once and looked up by relative
+    URL path in O(1).
+
+    Entries are immutable and `refresh()` swaps in a new mapping, so
+    requests in flight keep the version they started with. Files added or
+    changed on disk are only picked up by `refresh()` (see `watch()`).
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self._stats = {}  # relative path -> (mtime_ns, size)
+        self._assets = {}
+        self.refresh()
+
+    def get(self, relative):
+        return self._assets.get(relative)
+
+    def __len__(self):
+        return len(self._assets)
+
+    def scan(self):
+        """Relative path -> (path, stat) of every file in the directory"""
+        found = {}
+        for dirpath, dirnames, filenames in os.walk(self.directory):
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith('.')]
+            for name in filenames:
+                if name.startswith('.'):
+                    continue
+                path = Path(dirpath, name)
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                found[path.relative_to(self.directory).as_posix()] = (path, stat)
+        return found
+
+    def refresh(self):
+        """Rescan the directory, reloading only files whose mtime or size changed"""
+        found = self.scan()
+        stats = {rel: (stat.st_mtime_ns, stat.st_size) for rel, (_, stat) in found.items()}
+        if stats == self._stats:
+            return 0
+
+        def changed(rel):
+            return rel not in self._assets or stats[rel] != self._stats.get(rel)
+
+        assets = {}
+        # Precompressed siblings first, so their originals can reference them
+        siblings = {rel for rel in found if rel.endswith(tuple(suffix for _, suffix in ENCODINGS))}
+        for rel in sorted(siblings) + sorted(found.keys() - siblings):
+            path, stat = found[rel]
+            names = [rel + suffix for _, suffix in ENCODINGS]
+            if (not any(changed(name) for name in [rel] + names if name in found)
+                    and all((name in found) == (name in self._assets) for name in names)):
+                assets[rel] = self._assets[rel]
+                continue
+            variants = {coding: assets[rel + suffix] for coding, suffix in ENCODINGS if rel + suffix in assets}
+            try:
+                asset = load_asset(path, stat, guess_type(path), variants)
+            except OSError:  # removed since the scan
+                continue
+            if rel not in siblings and 'gzip' not in variants:
+                compressed = gzip_asset(asset)
+                if compressed:
+                    asset = asset._replace(variants={**variants, 'gzip': compressed})
+            assets[rel] = asset
+
+        updated = sum(1 for rel, asset in assets.items() if asset is not self._assets.get(rel))
+        updated += len(self._assets.keys() - assets.keys())
+        self._assets, self._stats = assets, stats
+        return updated
+
+    def watch(self, interval=1.0, on_change=None):
+        """Refresh from a daemon thread every `interval` seconds"""
+        def run():
+            while True:
+                time.sleep(interval)
+                updated = self.refresh()
+                if updated and on_change:
+                    on_change(self, updated)
+
+        threading.Thread(target=run, name=f'watch {self.directory}', daemon=True).start()
+
+
+class UpstreamPool:
+    """Idle keep-alive connections to the upstream, shared by all handler threads"""
+
+    def __init__(self, url, max_idle=32):
+        parts = urllib.parse.urlsplit(url)
+        self.url = url
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def connect(self):
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=PROXY_CONNECT_TIMEOUT)
+        conn.connect()
+        conn.sock.settimeout(PROXY_READ_TIMEOUT)
+        conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return conn
+
+    def acquire(self, fresh=False):
+        """(connection, whether it was reused from the pool)"""
+        if not fresh:
+            with self._lock:
+                if self._idle:
+                    return self._idle.pop(), True
+        return self.connect(), False
+
+    def release(self, conn):
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+
+class LandingPageHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive; every response has a Content-Length
+    timeout = 30  # close idle keep-alive connections
+    # Headers and the body go out as separate writes; without
+    # TCP_NODELAY, Nagle + delayed ACK add ~40 ms to every response
+    disable_nagle_algorithm = True
 
-class LandingPageHandler(SimpleHTTPRequestHandler):
     def do_GET(self):
-        # Root path - serve landing page
-        if self.path == '/' or self.path == '/index.html':
+        path = urllib.parse.unquote(self.path.split('?', 1)[0])
+
+        # Root path - serve landing page (EXACT match only, as in nginx.conf)
+        if path == '/':
+            self.send_asset(self.server.landing_assets.get('index.html'))
+
+        # BrandFactory static files
+        elif path.startswith('/brandfactory/'):
+            self.send_asset(self.server.static_assets.get(path[len('/brandfactory/'):]))
+
+        # React build assets and landing images
+        elif path.startswith('/assets/') or path.lower().endswith(IMAGE_EXTENSIONS):
+            self.send_asset(self.server.landing_assets.get(path[1:]), cache_control=IMMUTABLE)
+
+        elif path == '/health':
+            body = b'healthy\n'
             self.send_response(200)
-            self.send_header('Content-type', 'text/html')
+            self.send_header('Content-Type', 'text/plain')
+            self.send_header('Content-Length', str(len(body)))
             self.end_headers()
+            if self.command != 'HEAD':
+                self.wfile.write(body)
 
-            with open('landing/index.html', 'rb') as f:
-                self.wfile.write(f.read())
+        # Catch-all: /workspace, /auth, /api, /static, ... go to Open WebUI
+        else:
+            self.proxy()
 
-        # Workspace path - proxy to Open WebUI
-        elif self.path.startswith('/workspace'):
-            # In real deployment, nginx would proxy this
-            # For demo, just redirect
-            self.send_response(302)
-            self.send_header('Location', 'http://localhost:8080')
-            self.end_headers()
+    def do_HEAD(self):
+        self.do_GET()
 
-        # BrandFactory static files
-        elif self.path.startswith('/brandfactory/'):
+    # Everything but GET/HEAD belongs to Open WebUI
+    def do_POST(self):
+        self.proxy()
+
+    do_PUT = do_PATCH = do_DELETE = do_OPTIONS = do_POST
+
+    def forwarded_headers(self):
+        """Request headers for the upstream: hop-by-hop removed, nginx.conf's headers set"""
+        host = self.headers.get('Host', '')
+        hostname = host if host.endswith(']') else host.rsplit(':', 1)[0]
+        client_ip = self.client_address[0]
+        forwarded_for = self.headers.get('X-Forwarded-For')
+        drop = HOP_BY_HOP | FORWARDED | {
+            name.strip().lower() for name in self.headers.get('Connection', '').split(',')
+        }
+
+        headers = [(name, value) for name, value in self.headers.items() if name.lower() not in drop]
+        headers += [
+            ('Host', hostname),
+            ('X-Real-IP', client_ip),
+            ('X-Forwarded-For', f'{forwarded_for}, {client_ip}' if forwarded_for else client_ip),
+            ('X-Forwarded-Proto', 'http'),
+            ('X-Forwarded-Host', hostname),
+            ('X-Forwarded-Port', str(self.server.server_address[1])),
+        ]
+        return headers
+
+    def proxy(self):
+        """Stream the request to Open WebUI and its response back as it arrives"""
+        if self.server.upstream is None:
+            self.send_error(404, 'Not found')
+            return
+        if self.headers.get('Upgrade') and 'upgrade' in self.headers.get('Connection', '').lower():
+            self.proxy_websocket()
+            return
+
+        pool = self.server.upstream
+        headers = self.forwarded_headers()
+        chunked = 'chunked' in self.headers.get('Transfer-Encoding', '').lower()
+        length = 0 if chunked else int(self.headers.get('Content-Length') or 0)
+        if chunked:
+            headers.append(('Transfer-Encoding', 'chunked'))
+
+        for attempt in range(2):
+            conn, reused = None, False
             try:
-                # Remove /brandfactory/ prefix
-                file_path = 'static' + self.path.replace('/brandfactory', '')
-
-                if os.path.exists(file_path):
-                    self.send_response(200)
-                    if file_path.endswith('.png'):
-                        self.send_header('Content-type', 'image/png')
-                    self.end_headers()
-
-                    with open(file_path, 'rb') as f:
-                        self.wfile.write(f.read())
-                else:
-                    self.send_error(404, 'File not found')
-            except Exception as e:
-                self.send_error(500, str(e))
+                conn, reused = pool.acquire(fresh=attempt > 0)
+                conn.putrequest(self.command, self.path, skip_host=True, skip_accept_encoding=True)
+                for name, value in headers:
+                    conn.putheader(name, value)
+                conn.endheaders()
+                if chunked:
+                    self.forward_chunked_body(conn.sock)
+                elif length:
+                    self.forward_body(conn.sock, length)
+                response = conn.getresponse()
+                break
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError) as e:
+                if conn is not None:
+                    conn.close()
+                # The upstream closed an idle pooled connection; retry once if
+                # no request body has been consumed yet
+                if attempt == 0 and reused and not chunked and not length:
+                    continue
+                self.upstream_error(502, f'Upstream connection failed: {e}')
+                return
+            except socket.timeout:
+                if conn is not None:
+                    conn.close()
+                self.upstream_error(504, 'Upstream timed out')
+                return
+            except (OSError, http.client.HTTPException) as e:
+                if conn is not None:
+                    conn.close()
+                self.upstream_error(502, f'Upstream unavailable: {e!r}')
+                return
+
+        has_body = self.command != 'HEAD' and response.status not in (204, 304)
+        # Re-chunk bodies of unknown length for HTTP/1.1 clients; HTTP/1.0
+        # clients read until the connection closes
+        rechunk = has_body and response.length is None and self.request_version == 'HTTP/1.1'
+        if has_body and response.length is None and not rechunk:
+            self.close_connection = True
 
+        self.log_request(response.status)
+        self.send_response_only(response.status, response.reason)
+        for name, value in response.getheaders():
+            if name.lower() not in HOP_BY_HOP:
+                self.send_header(name, value)
+        if rechunk:
+            self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        try:
+            while has_body:
+                data = response.read1(65536)
+                if not data:
+                    break
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data) if rechunk else data)
+            if rechunk:
+                self.wfile.write(b'0\r\n\r\n')
+            # read1() leaves the response open at the end of the body;
+            # this closes it so the connection can be reused
+            response.read()
+        except (OSError, http.client.HTTPException):
+            # Client went away or upstream failed mid-body; neither side is reusable
+            self.close_connection = True
+            conn.close()
+            return
+
+        if response.will_close or not response.isclosed():
+            conn.close()
         else:
-            self.send_error(404, 'Not found')
+            pool.release(conn)
+
+    def upstream_error(self, code, message):
+        """Error page for a failed proxy request; the request body may be half-read, so close"""
+        self.close_connection = True
+        self.send_error(code, message)
+
+    def forward_body(self, sock, length):
+        """Copy a Content-Length request body to the upstream in pieces"""
+        while length > 0:
+            data = self.rfile.read1(min(length, 65536))
+            if not data:
+                raise ConnectionResetError('client closed during request body')
+            sock.sendall(data)
+            length -= len(data)
+
+    def forward_chunked_body(self, sock):
+        """Copy a chunked request body to the upstream chunk by chunk, as received"""
+        while True:
+            size_line = self.rfile.readline(65537)
+            sock.sendall(size_line)
+            size = int(size_line.split(b';', 1)[0].strip() or b'0', 16)
+            if size == 0:
+                # Trailers, terminated by an empty line
+                while True:
+                    line = self.rfile.readline(65537)
+                    sock.sendall(line)
+                    if line in (b'\r\n', b'\n', b''):
+                        return
+            self.forward_body(sock, size + 2)  # data + CRLF
+
+    def proxy_websocket(self):
+        """Pass a WebSocket upgrade to the upstream, then relay raw bytes both ways"""
+        pool = self.server.upstream
+        try:
+            upstream = socket.create_connection((pool.host, pool.port), timeout=PROXY_CONNECT_TIMEOUT)
+        except socket.timeout:
+            self.upstream_error(504, 'Upstream timed out')
+            return
+        except OSError as e:
+            self.upstream_error(502, f'Upstream unavailable: {e}')
+            return
+
+        headers = self.forwarded_headers() + [
+            ('Upgrade', self.headers['Upgrade']),
+            ('Connection', 'upgrade'),
+        ]
+        request = f'{self.command} {self.path} HTTP/1.1\r\n'
+        request += ''.join(f'{name}: {value}\r\n' for name, value in headers) + '\r\n'
+
+        self.close_connection = True
+        self.log_message('"%s" upgraded to %s', self.requestline, self.headers['Upgrade'])
+        upstream.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        # Idle WebSockets are closed after the proxy read timeout, as in nginx
+        upstream.settimeout(PROXY_READ_TIMEOUT)
+        self.connection.settimeout(PROXY_READ_TIMEOUT)
+
+        def upstream_to_client():
+            try:
+                while True:
+                    data = upstream.recv(65536)
+                    if not data:
+                        break
+                    self.connection.sendall(data)
+            except OSError:
+                pass
+            finally:
+                # Unblocks the client reader below
+                try:
+                    self.connection.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+        relay = threading.Thread(target=upstream_to_client, daemon=True)
+        try:
+            upstream.sendall(request.encode('latin-1'))
+            relay.start()
+            while True:
+                # read1 also returns frames already buffered with the request
+                data = self.rfile.read1(65536)
+                if not data:
+                    break
+                upstream.sendall(data)
+        except OSError:
+            pass
+        finally:
+            try:
+                upstream.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            if relay.ident is not None:
+                relay.join()
+            upstream.close()
+
+    def send_asset(self, asset, cache_control=REVALIDATE):
+        """
+        Send an indexed file with its MIME type, length and validators; 404
+        if there is none. Handles conditional requests, Range and
+        compressed variants.
+        """
+        if asset is None:
+            self.send_error(404, 'File not found')
+            return
+
+        # Pick the compressed variant the client accepts, if there is one
+        encoding, variant = None, asset
+        if asset.variants:
+            accepted = accepted_encodings(self.headers.get('Accept-Encoding'))
+            for coding, _ in ENCODINGS:
+                if coding in accepted and coding in asset.variants:
+                    encoding, variant = coding, asset.variants[coding]
+                    break
+
+        size = variant.size
+        common = [
+            ('ETag', variant.etag),
+            ('Last-Modified', variant.last_modified),
+            ('Cache-Control', cache_control),
+            ('Accept-Ranges', 'bytes'),
+        ]
+        if asset.variants:
+            common.append(('Vary', 'Accept-Encoding'))
+
+        if self.not_modified(variant.etag, variant.mtime):
+            self.send_response(304)
+            for header in common:
+                self.send_header(*header)
+            self.end_headers()
+            return
+
+        byte_range = None
+        if self.command == 'GET' and self.if_range_matches(variant.etag, variant.last_modified):
+            byte_range = parse_range(self.headers.get('Range'), size)
+        if byte_range == 'unsatisfiable':
+            self.send_response(416)
+            self.send_header('Content-Range', f'bytes */{size}')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        start, end = byte_range or (0, size - 1)
+        self.send_response(206 if byte_range else 200)
+        self.send_header('Content-Type', asset.mime)
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Content-Length', str(end - start + 1))
+        if byte_range:
+            self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+        for header in common:
+            self.send_header(*header)
+        self.end_headers()
+        if self.command != 'HEAD' and end >= start:
+            with memoryview(variant.data) as view:
+                self.wfile.write(view[start:end + 1])
+
+    def not_modified(self, etag, mtime):
+        """True if the client's cached copy is current (If-None-Match, then If-Modified-Since)"""
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+            return '*' in tags or etag in tags
+
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def if_range_matches(self, etag, last_modified):
+        """A Range applies only if If-Range (when sent) still matches this version"""
+        if_range = self.headers.get('If-Range')
+        return if_range is None or if_range.strip() in (etag, last_modified)
 
     def log_message(self, format, *args):
-        print(f"[Landing Page Server] {format % args}")
+        if not self.server.quiet:
+            print(f"[Landing Page Server] {format % args}")
+
+
+class LandingPageServer(ThreadingHTTPServer):
+    daemon_threads = True
+    quiet = False
+    upstream = None  # UpstreamPool; None disables the catch-all proxy
+    static_assets = landing_assets = {}  # AssetIndex of STATIC_DIR / LANDING_DIR
+
 
 if __name__ == '__main__':
-    port = 8081
-    server = HTTPServer(('localhost', port), LandingPageHandler)
+    parser = argparse.ArgumentParser(description='BrandFactory landing page demo server')
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--quiet', action='store_true', help='Do not log requests')
+    parser.add_argument('--upstream', default=UPSTREAM,
+                        help='Open WebUI URL for the catch-all proxy (env LANDING_UPSTREAM)')
+    parser.add_argument('--static-dir', type=Path, default=STATIC_DIR,
+                        help='Directory served at /brandfactory/')
+    parser.add_argument('--landing-dir', type=Path, default=LANDING_DIR,
+                        help='Landing page build (index.html, assets/)')
+    parser.add_argument('--watch', action='store_true',
+                        help='Reload files changed on disk (checked every second)')
+    args = parser.parse_args()
+    STATIC_DIR, LANDING_DIR = args.static_dir, args.landing_dir
+
+    port = args.port
+    server = LandingPageServer((args.host, port), LandingPageHandler)
+    server.quiet = args.quiet
+    server.upstream = UpstreamPool(args.upstream)
+    server.static_assets = AssetIndex(STATIC_DIR)
+    server.landing_assets = AssetIndex(LANDING_DIR)
+    if args.watch:
+        def reloaded(index, updated):
+            print(f"[Landing Page Server] Reloaded {updated} file(s) in {index.directory}")
+        server.static_assets.watch(on_change=reloaded)
+        server.landing_assets.watch(on_change=reloaded)
 
     print("╔══════════════════════════════════════════════════════════╗")
     print("║  🎨 BrandFactory Landing Page Demo Server               ║")
     print("╚══════════════════════════════════════════════════════════╝")
     print("")
-    print("📍 Landing Page:  http://localhost:8081")
-    print("📍 Workspace:     http://localhost:8081/workspace → redirects to :8080")
-    print("📍 Direct WebUI:  http://localhost:8080")
+    print(f"📍 Landing Page:  http://localhost:{port}")
+    print(f"📍 Workspace:     http://localhost:{port}/workspace → proxied to {args.upstream}")
+    print(f"📍 Direct WebUI:  {args.upstream}")
+    print(f"📦 Indexed {len(server.static_assets)} static and {len(server.landing_assets)} landing files"
+          f"{' (watching for changes)' if args.watch else ''}")
     print("")
     print("✨ This demonstrates how users will experience BrandFactory:")
-    print("   1. First see the branded landing page (:8081)")
-    print("   2. Click 'Launch Workspace' → redirected to Open WebUI (:8080)")
+    print(f"   1. First see the branded landing page (:{port})")
+    print("   2. Click 'Launch Workspace' → Open WebUI, through the same proxy as nginx.conf")
     print("")
     print("Press Ctrl+C to stop the server")
     print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
-    print("")
+    print("", flush=True)
 
     try:
         server.serve_forever()
     except KeyboardInterrupt:
         print("\n\n🛑 Stopping server...")
-        server.shutdown()
+        server.server_close()